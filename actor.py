@@ -0,0 +1,82 @@
+import asyncio
+import contextvars
+import time
+import metrics
+
+class GameActor:
+    # every mutation of one game runs here, one command at a time, while other games run in parallel
+    game:object
+    mailbox:asyncio.Queue # (command, args, context, future, queuedAt)
+    task:asyncio.Task
+    running:asyncio.Task # the command being executed, in the context of the caller that queued it
+    closed:bool
+    processed:int
+    state:dict # snapshot published after the last command that changed the game
+    stateVersion:int
+
+    def __init__(self, game):
+        self.game = game
+        self.mailbox = asyncio.Queue()
+        self.task = None
+        self.running = None
+        self.closed = False
+        self.processed = 0
+        self.state = None
+        self.stateVersion = None
+
+    @property
+    def depth(self) -> int:
+        return self.mailbox.qsize()
+
+    async def call(self, command, *args):
+        # commands issued from inside a running command run inline, queueing them would deadlock the actor
+        if self.closed or asyncio.current_task() is self.running: return await self.execute(command, args)
+
+        future = asyncio.get_running_loop().create_future()
+        self.mailbox.put_nowait((command, args, contextvars.copy_context(), future, time.perf_counter()))
+        if self.task is None: self.task = asyncio.create_task(self.run())
+        return await future
+
+    async def execute(self, command, args:tuple):
+        result = command(*args)
+        if asyncio.iscoroutine(result): result = await result
+        return result
+
+    async def run(self):
+        while not self.mailbox.empty():
+            command, args, context, future, queuedAt = self.mailbox.get_nowait()
+            # the caller gave up while waiting, a cancelled ready countdown for example
+            if future.cancelled(): continue
+
+            name = getattr(command, "__qualname__", "command")
+            start = time.perf_counter()
+            metrics.observe("dementia_actor_wait_seconds", name, start - queuedAt)
+            # per call accounting, an instrumented modal submit for example, sees the command as its own
+            self.running = asyncio.create_task(self.execute(command, args), context=context)
+            try: result = await self.running
+            except asyncio.CancelledError:
+                if asyncio.current_task().cancelling(): raise
+                future.cancel()
+            except Exception as e:
+                if not future.cancelled(): future.set_exception(e)
+            else:
+                if not future.cancelled(): future.set_result(result)
+            finally:
+                self.running = None
+                metrics.observe("dementia_actor_service_seconds", name, time.perf_counter() - start)
+                self.processed += 1
+                self.publish()
+        self.task = None
+
+    def publish(self):
+        if self.stateVersion == self.game.version: return
+        self.state = self.game.snapshot()
+        self.stateVersion = self.game.version
+
+    def published(self) -> dict:
+        self.publish()
+        return self.state
+
+    def close(self):
+        # whatever is already queued still runs, later calls run inline against the finished game
+        self.closed = True
@@ -0,0 +1,53 @@
+import random
+
+def twoCycleTable(limit:int) -> list[float]:
+    # p[k] = (k-1)*D(k-2)/D(k), the chance that the k-th element of a uniform derangement of k sits in a 2-cycle,
+    # exact from integer derangement numbers, past the table D(k)/D(k-1) rounds to k in a double and p[k] to 1/k
+    counts = [1, 0]
+    for k in range(2, limit + 1): counts.append((k - 1) * (counts[-1] + counts[-2]))
+    return [0.0, 0.0] + [(k - 1) * counts[k - 2] / counts[k] for k in range(2, limit + 1)]
+
+TWO_CYCLE:list[float] = twoCycleTable(32)
+
+def derangement(items:list, rng:random.Random = random) -> dict:
+    # uniform random derangement in O(n), built from the D(n) = (n-1)*(D(n-1) + D(n-2)) recurrence
+    if len(items) == 1: raise ValueError("a single item cannot be deranged")
+    uniform = rng.random
+    alive = list(items)
+    steps = []
+
+    while alive:
+        item = alive.pop()
+        k = len(alive) + 1
+        # int(random() * n) instead of randrange, its bias of n / 2**53 is far below anything a game could show
+        index = int(uniform() * (k - 1))
+        if uniform() < (TWO_CYCLE[k] if k < len(TWO_CYCLE) else 1 / k):
+            alive[index], alive[-1] = alive[-1], alive[index]
+            steps.append((item, alive.pop(), True))
+        else:
+            steps.append((item, alive[index], False))
+
+    mapping = {}
+    for item, other, paired in reversed(steps):
+        if paired:
+            mapping[item] = other
+            mapping[other] = item
+        else:
+            # insert item into the cycle of other, right after it
+            mapping[item] = mapping[other]
+            mapping[other] = item
+    return mapping
+
+def singleCycle(items:list, rng:random.Random = random) -> dict:
+    # Sattolo's algorithm, uniform over permutations made of exactly one cycle
+    if len(items) == 1: raise ValueError("a single item cannot be deranged")
+    order = list(items)
+    for i in range(len(order) - 1, 0, -1):
+        j = rng.randrange(i)
+        order[i], order[j] = order[j], order[i]
+    return {item: target for item, target in zip(items, order)}
+
+def cycleOrder(mapping:dict, start) -> list:
+    order = [start]
+    while mapping[order[-1]] != start: order.append(mapping[order[-1]])
+    return order
@@ -0,0 +1,46 @@
+import collections
+import math
+import os
+import random
+import sys
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import assignment
+
+def rejection(players:list, rng:random.Random) -> list:
+    # the loop previously used by Game.startLobby
+    targets = players.copy()
+    while True:
+        rng.shuffle(targets)
+        if all([player != target for player, target in zip(players, targets)]): break
+    return targets
+
+def chiSquare(generate, n:int, expected:int, samples:int, rng:random.Random) -> tuple[float, int]:
+    counts = collections.Counter(tuple(sorted(generate(list(range(n)), rng).items())) for _ in range(samples))
+    mean = samples / expected
+    statistic = sum((count - mean) ** 2 / mean for count in counts.values()) + (expected - len(counts)) * mean
+    return statistic, expected - 1
+
+def uniformity(rng:random.Random) -> bool:
+    # D(5) = 44 derangements, (5-1)! = 24 single cycles, the statistic should stay near its degrees of freedom
+    uniform = True
+    for name, generate, expected in [("derangement", assignment.derangement, 44), ("singleCycle", assignment.singleCycle, 24)]:
+        statistic, freedom = chiSquare(generate, 5, expected, expected * 2000, rng)
+        z = (statistic - freedom) / math.sqrt(2 * freedom)
+        print(f"{name:<12} chi2={statistic:8.2f} df={freedom:3} z={z:6.2f} {'ok' if abs(z) < 4 else 'SUSPICIOUS'}")
+        uniform = uniform and abs(z) < 4
+    return uniform
+
+if __name__ == "__main__":
+    rng = random.Random(int(sys.argv[1]) if len(sys.argv) > 1 else 0)
+    # the seed is fixed so a biased generator fails every run instead of one in a few thousand
+    if not uniformity(rng): raise SystemExit(1)
+    print(f"{'players':>8} {'rejection':>12} {'derangement':>12} {'singleCycle':>12}")
+    for n in [10, 100, 1000, 10000, 100000]:
+        players = list(range(n))
+        number = max(1, 20000 // n)
+        # the mean, not the best run, the rejection loop's time is geometric and its best run is a single shuffle
+        times = [sum(timeit.repeat(lambda: func(players, rng), number=number, repeat=5)) / (5 * number) for func in (rejection, assignment.derangement, assignment.singleCycle)]
+        print(f"{n:>8} " + " ".join(f"{t * 1e3:>10.3f}ms" for t in times))
@@ -0,0 +1,54 @@
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import guess
+
+SYLLABLES:dict[str, list[str]] = {
+    "en": ["the ", "an ", "mar", "tin", "lu", "ther", "king", "na", "po", "le", "on", "bo", "na", "par", "te", "ein", "stein", "new", "ton", "cu", "rie"],
+    "pl": ["ma", "rii", "skło", "dow", "ska", "cu", "rie", "ło", "kie", "tek", "ko", "per", "nik", "szo", "pen", "żół", "ćma", "źdź", "bło", "ń"],
+}
+
+def levenshtein(a:str, b:str) -> int:
+    row = list(range(len(b) + 1))
+    for i, ca in enumerate(a, 1):
+        previous, row[0] = row[:], i
+        for j, cb in enumerate(b, 1): row[j] = min(previous[j] + 1, row[j - 1] + 1, previous[j - 1] + (ca != cb))
+    return row[-1]
+
+def identities(languageCode:str, count:int, rng:random.Random) -> list[str]:
+    syllables = SYLLABLES[languageCode]
+    return [" ".join("".join(rng.choice(syllables) for _ in range(rng.randint(2, 4))).title() for _ in range(rng.randint(1, 3))) for _ in range(count)]
+
+def typo(text:str, rng:random.Random) -> str:
+    if not text or rng.random() < 0.3: return text.upper()
+    i = rng.randrange(len(text))
+    return text[:i] + rng.choice("aeiouxyz") + text[i + 1:]
+
+def bench(languageCode:str, count:int, rng:random.Random):
+    names = identities(languageCode, count, rng)
+    guesses = [typo(name, rng) if rng.random() < 0.5 else rng.choice(names) for name in names]
+
+    start = time.perf_counter()
+    matchers = [guess.Matcher(name, languageCode) for name in names]
+    index = time.perf_counter() - start
+
+    start = time.perf_counter()
+    results = [matcher.matches(text) for matcher, text in zip(matchers, guesses)]
+    myers = time.perf_counter() - start
+
+    normalized = [matcher.prepare(text) for matcher, text in zip(matchers, guesses)]
+    start = time.perf_counter()
+    reference = [text != "" and levenshtein(matcher.normalized, text) <= matcher.threshold for matcher, text in zip(matchers, normalized)]
+    dp = time.perf_counter() - start
+
+    assert results == reference
+    print(f"{languageCode}  {count} identities  index {index / count * 1e6:6.2f} us  match {myers / count * 1e6:6.2f} us  dp {dp / count * 1e6:7.2f} us  ({dp / myers:.1f}x)  {sum(results)} matched")
+
+if __name__ == "__main__":
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 50000
+    rng = random.Random(0)
+    for languageCode in SYLLABLES: bench(languageCode, count, rng)
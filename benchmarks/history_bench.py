@@ -0,0 +1,52 @@
+import asyncio
+import os
+import random
+import sys
+import tempfile
+import time
+from types import SimpleNamespace
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import config
+import history
+
+def fakeGame(gameId:int, rng:random.Random) -> SimpleNamespace:
+    players = {userId: SimpleNamespace(id=userId, identity=f"identity {userId}", notes=[("q", "a")] * rng.randint(0, 6), guesses=rng.randint(0, 4), guessed=rng.random() < 0.4) for userId in rng.sample(range(5000), rng.randint(2, 8))}
+    return SimpleNamespace(id=gameId, guildId=rng.randrange(50), gamemode="healing", languageCode="en", startedAt=time.time() - rng.randint(60, 1800), players=players, playerCount=len(players), winnerCount=sum(player.guessed for player in players.values()))
+
+async def bench(games:int, batchSize:int, rng:random.Random):
+    config.History.batchSize = batchSize
+    config.History.flushInterval = 0.01
+    store = history.HistoryStore()
+    with tempfile.TemporaryDirectory() as root:
+        await store.open(os.path.join(root, "history.sqlite3"))
+        fakes = [fakeGame(i, rng) for i in range(games)]
+
+        start = time.perf_counter()
+        for game in fakes: store.append(game, "allGuessed", time.time())
+        loop = time.perf_counter() - start
+        while store.writes < games:
+            if store.task is None and store.pending: store.flushNow()
+            await asyncio.sleep(0.001)
+        elapsed = time.perf_counter() - start
+        print(f"batch {batchSize:>4}: {games} games in {elapsed:.2f}s ({games / elapsed:.0f} games/s), {store.batches} transactions, {loop * 1e6 / games:.1f}us on the event loop per game")
+
+        if batchSize == 1: store.close(); return
+        plan = store.connection.execute("EXPLAIN QUERY PLAN SELECT userId, wins, games FROM stats WHERE guildId = ? ORDER BY wins DESC, games LIMIT ?", (1, 10)).fetchall()
+        print(f"leaderboard plan: {plan[-1][-1]}")
+        start = time.perf_counter()
+        for _ in range(1000): await store.leaderboard(rng.randrange(50), config.History.leaderboardSize)
+        print(f"leaderboard: {(time.perf_counter() - start) * 1e3:.0f}us per query")
+        start = time.perf_counter()
+        for _ in range(1000): await store.user(rng.randrange(50), rng.randrange(5000))
+        print(f"user stats: {(time.perf_counter() - start) * 1e3:.0f}us per query")
+        store.close()
+
+def main():
+    rng = random.Random(19)
+    for batchSize in (1, 10, 100):
+        asyncio.run(bench(5000, batchSize, rng))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,51 @@
+import os
+import sys
+import time
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.chdir(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import language
+
+# module lookups done by one lobby click: lobbyEmbed, lobbyView, updateChannelStatus and an error.send
+RENDER = [("lobby", "en"), ("gamemodes", "en"), ("lobby", "en"), ("channel", "en"), ("errors", "en")]
+
+def renderFromDisk():
+    for moduleName, languageCode in RENDER: language.readJson(os.path.join(language.ROOT, languageCode, f"{moduleName}.json"))
+    language.readJson(os.path.join(language.ROOT, "codes.json"))
+
+def renderFromCatalog():
+    for moduleName, languageCode in RENDER: language.getModule(moduleName, languageCode)
+    language.getCodes()
+
+def startupFromSources():
+    # what a start cost before the bundle: parse every json file, validate it and freeze it
+    codes, modules = language.readSources(language.ROOT)
+    language.validate(codes, modules, "en")
+    language.freeze(codes), language.freeze(modules)
+
+def startup(number:int):
+    language.build()
+    sources = min(timeit.repeat(startupFromSources, number=number, repeat=3)) / number
+    bundle = min(timeit.repeat(language.Catalog, number=number, repeat=3)) / number
+    start = time.perf_counter()
+    language.build()
+    build = time.perf_counter() - start
+    print(f"{'build':<12} {build * 1e3:10.2f} ms (once per change)")
+    print(f"{'sources':<12} {sources * 1e3:10.2f} ms/start")
+    print(f"{'bundle':<12} {bundle * 1e3:10.2f} ms/start")
+    print(f"startup      {sources / bundle:10.1f}x")
+
+def bench(name:str, func, number:int):
+    seconds = min(timeit.repeat(func, number=number, repeat=5))
+    print(f"{name:<12} {seconds / number * 1e6:10.2f} us/render")
+    return seconds / number
+
+if __name__ == "__main__":
+    number = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    startup(20)
+    language.load()
+    before = bench("disk", renderFromDisk, number)
+    after = bench("catalog", renderFromCatalog, number)
+    print(f"speedup      {before / after:10.1f}x")
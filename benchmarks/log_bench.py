@@ -0,0 +1,41 @@
+import io
+import os
+import queue
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import log
+
+class SlowPipe(io.StringIO):
+    # stdout behind a consumer that reads one line per millisecond
+    def write(self, text:str) -> int:
+        time.sleep(0.001)
+        return super().write(text)
+
+def bench(name:str, emit, count:int):
+    start = time.perf_counter()
+    worst = 0
+    for i in range(count):
+        before = time.perf_counter()
+        emit(i)
+        worst = max(worst, time.perf_counter() - before)
+    elapsed = time.perf_counter() - start
+    print(f"{name:<8} {elapsed / count * 1e6:8.1f}us per record on the event loop, worst {worst * 1e3:6.2f}ms")
+
+def main():
+    count = 5000
+    pipe = SlowPipe()
+    bench("print", lambda i: print(f"Game {i} timed out.", file=pipe), count)
+
+    log.QUEUE = queue.Queue(1000)
+    log.HANDLER.queue = log.QUEUE
+    log.setup(SlowPipe())
+    bench("log", lambda i: log.info("game timed out", gameId=i, guildId=1, phase="waiting"), count)
+    log.warning("benchmark finished")
+    log.stop()
+    print(f"dropped: {log.HANDLER.dropped}")
+
+if __name__ == "__main__":
+    main()
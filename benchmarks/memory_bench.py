@@ -0,0 +1,62 @@
+import asyncio
+import gc
+import os
+import random
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.chdir(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import config
+import modal
+import game
+import diagnostics
+import timeouts
+from registry import GAMES
+
+class FakeObject:
+    def __init__(self, id:int):
+        self.id = id
+        self.channel = self
+
+    async def edit(self, **kwargs): pass
+
+def createGame(gameId:int, players:int, rng:random.Random) -> game.Game:
+    g = game.Game(None, FakeObject(gameId % 97), hostId=gameId * 100, id=gameId, languageCode="en", gamemode="healing", vc=FakeObject(gameId), msg=FakeObject(gameId + 1))
+    GAMES.add(g)
+    for i in range(1, players): g.add_player(gameId * 100 + i)
+    for playerId in g.players: g.setReady(playerId, True)
+    g.startLobby(rng)
+    for player in g.players.values():
+        player.setIdentity(f"identity {player.id}", "en")
+    g.lobbyEmbed(), g.lobbyView()
+    return g
+
+async def main(count:int, players:int):
+    config.Registry.maxGames = count
+    config.Diagnostics.leakAfter = 0
+    rng = random.Random(24)
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    for gameId in range(1, count + 1): createGame(gameId, players, rng)
+    allocated = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+    print(f"{count} games of {players} players: {allocated / count / 1024:.1f} KiB allocated per game")
+
+    start = time.perf_counter()
+    data = diagnostics.summary(GAMES)
+    print(f"diagnostics over {data['games']} games in {(time.perf_counter() - start) * 1e3:.0f} ms, ~{data['bytes'] / count / 1024:.1f} KiB reachable per game")
+
+    for g in list(GAMES.values()): await g.cancel("timeout")
+    del g
+    await asyncio.sleep(0)
+    print(f"survivors after teardown: {len(diagnostics.survivors(GAMES))}")
+    timeouts.SCHEDULER.heap.clear()
+
+if __name__ == "__main__":
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    players = int(sys.argv[2]) if len(sys.argv) > 2 else 6
+    asyncio.run(main(count, players))
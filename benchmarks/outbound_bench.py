@@ -0,0 +1,57 @@
+import asyncio
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import config
+import outbound
+
+ROUTES:dict[int, str] = {outbound.GAME_MESSAGE: "webhook.edit_message", outbound.LOBBY_MESSAGE: "channel.edit_message", outbound.CHANNEL_STATUS: "channel.edit_status"}
+
+async def bench(name:str, prioritized:bool, requests:int, rng:random.Random):
+    scheduler = outbound.RequestScheduler()
+    waits = {priority: [] for priority in outbound.CLASSES}
+
+    async def request(priority:int, bucket:int):
+        async def call():
+            # every bucket allows 5 calls per 0.2s, like discord's headers would report
+            await asyncio.sleep(rng.uniform(0.03, 0.07))
+            scheduler.observe({"X-RateLimit-Remaining": str(rng.randint(0, 4)), "X-RateLimit-Reset-After": "0.2"})
+        start = time.perf_counter()
+        await scheduler.run(priority if prioritized else outbound.GAME_MESSAGE, ROUTES[priority], bucket, call)
+        waits[priority].append(time.perf_counter() - start)
+
+    # a burst far above the connection budget, mostly status writes and lobby edits with game messages mixed in
+    burst = [rng.choice((outbound.GAME_MESSAGE, outbound.LOBBY_MESSAGE, outbound.CHANNEL_STATUS, outbound.CHANNEL_STATUS)) for _ in range(requests)]
+    start = time.perf_counter()
+    await asyncio.gather(*(request(priority, rng.randrange(200)) for priority in burst))
+    elapsed = time.perf_counter() - start
+    line = " ".join(f"{outbound.CLASSES[priority]} p50 {sorted(w)[len(w) // 2] * 1e3:6.0f}ms p99 {sorted(w)[int(len(w) * 0.99)] * 1e3:6.0f}ms" for priority, w in waits.items())
+    print(f"{name:<6} {requests} calls in {elapsed:.2f}s, {len(scheduler.tasks)} tasks left, {len(scheduler.buckets)} buckets left | {line}")
+
+async def exhausted() -> float:
+    # a request parked behind a full bucket whose in flight response then reports it empty has to run once the bucket resets
+    scheduler = outbound.RequestScheduler()
+    async def emptying():
+        await asyncio.sleep(0.05)
+        scheduler.observe({"X-RateLimit-Remaining": "0", "X-RateLimit-Reset-After": "0.3"})
+    async def noop(): pass
+    first = [asyncio.create_task(scheduler.run(outbound.GAME_MESSAGE, ROUTES[outbound.GAME_MESSAGE], 1, emptying)) for _ in range(config.Outbound.routeLimit)]
+    await asyncio.sleep(0)
+    start = time.perf_counter()
+    await asyncio.wait_for(scheduler.run(outbound.GAME_MESSAGE, ROUTES[outbound.GAME_MESSAGE], 1, noop), 3)
+    await asyncio.gather(*first)
+    return time.perf_counter() - start
+
+def main():
+    config.Outbound.concurrency = 20
+    for prioritized in (False, True):
+        asyncio.run(bench("class" if prioritized else "fifo", prioritized, 3000, random.Random(23)))
+    try: print(f"parked behind an emptied bucket: ran after {asyncio.run(exhausted()) * 1e3:.0f} ms")
+    except asyncio.TimeoutError: print("parked behind an emptied bucket: never ran"); raise SystemExit(1)
+
+if __name__ == "__main__":
+    main()
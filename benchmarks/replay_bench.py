@@ -0,0 +1,80 @@
+import asyncio
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from collections import defaultdict
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.chdir(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import config
+import modal
+import game
+import dispatch
+import gamelog
+import render
+import timeouts
+from replay import Replay
+
+# the button a player pressed for each record, records without one come from timers or modal follow-ups
+ACTIONS:dict[int, str] = {gamelog.JOINED: "join", gamelog.LEFT: "leave", gamelog.READY: "ready", gamelog.QUIT_VOTE: "quit", gamelog.LANGUAGE: "language", gamelog.SETTINGS: "settings", gamelog.STARTED: "start", gamelog.IDENTITY: "open", gamelog.NOTE: "note", gamelog.GUESS: "guess"}
+
+def record(path:str, games:int):
+    # a trace recorded by the simulation stands in when no production log is given
+    subprocess.run([sys.executable, "-m", "simulation", "--games", str(games), "--latency", "0.002", "--jitter", "0", "--rate-limit", "0", "--record", path], check=True, stdout=subprocess.DEVNULL)
+
+def renderGame(g:game.Game):
+    # what the lobby message or every player's game message would be built from after the change
+    if g.lobbyStatus == "waiting": render.digest(g.lobbyEmbed(), g.lobbyView())
+    elif g.lobbyStatus == "playing":
+        for playerId in g.players: render.digest(g.gameEmbed(playerId), g.gameView(playerId))
+
+def percentile(values:list[float], fraction:float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))] if ordered else 0.0
+
+async def bench(records:list):
+    replay = Replay()
+    timings = defaultdict(lambda: defaultdict(list)) # path -> record kind -> seconds
+    for kind, gameId, _, values in records:
+        name = gamelog.KINDS[kind][0]
+        start = time.perf_counter()
+        if kind in (gamelog.CREATED, gamelog.RESTORED):
+            g = replay.apply(kind, gameId, values)
+            game.GAMES.add(g)
+        else:
+            # routed like a component interaction: custom id, registry lookup, then the game's actor
+            action, routedId = dispatch.parse(f"{ACTIONS.get(kind, 'ready')}-{gameId}")
+            g = game.GAMES.get(routedId)
+            if g is None: continue
+            await g.actor.call(replay.apply, kind, gameId, values)
+        routed = time.perf_counter()
+        renderGame(g)
+        rendered = time.perf_counter()
+        if kind == gamelog.ENDED: game.GAMES.remove(g)
+        timings["dispatch"][name].append(routed - start)
+        timings["render"][name].append(rendered - routed)
+
+    print(f"{len(records)} records, {len(replay.finished)} games replayed, {len(replay.mismatches)} mismatches")
+    print(f"{'record':<14} {'count':>7} {'dispatch p50':>13} {'p99':>9} {'render p50':>11} {'p99':>9}")
+    for name in sorted(timings["dispatch"]):
+        dispatchTimes, renderTimes = timings["dispatch"][name], timings["render"][name]
+        print(f"{name:<14} {len(dispatchTimes):>7} {percentile(dispatchTimes, 0.5) * 1e6:>11.1f}us {percentile(dispatchTimes, 0.99) * 1e6:>7.1f}us {percentile(renderTimes, 0.5) * 1e6:>9.1f}us {percentile(renderTimes, 0.99) * 1e6:>7.1f}us")
+    for path in ("dispatch", "render"):
+        total = sum(sum(values) for values in timings[path].values())
+        print(f"{path:<8} {total * 1e3:8.1f} ms total")
+    timeouts.SCHEDULER.heap.clear()
+    timeouts.ROUNDS.heap.clear()
+
+def main():
+    config.Registry.maxGames = 1 << 20
+    with tempfile.TemporaryDirectory() as directory:
+        path = sys.argv[1] if len(sys.argv) > 1 else os.path.join(directory, "gamelog.bin")
+        if len(sys.argv) <= 1: record(path, 100)
+        records = list(gamelog.read(path))
+    asyncio.run(bench(records))
+
+if __name__ == "__main__":
+    main()
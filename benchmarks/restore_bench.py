@@ -0,0 +1,65 @@
+import asyncio
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.chdir(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import config
+import modal
+import game
+import persistence
+import timeouts
+
+class FakeObject:
+    def __init__(self, id:int):
+        self.id = id
+        self.channel = self
+
+    async def edit(self, **kwargs): pass
+
+def createGame(gameId:int, players:int, rng:random.Random) -> game.Game:
+    g = game.Game(None, FakeObject(gameId % 97), hostId=gameId * 100, id=gameId, languageCode="en", gamemode="healing", vc=FakeObject(gameId), msg=FakeObject(gameId + 1))
+    for i in range(1, players): g.add_player(gameId * 100 + i)
+    if gameId % 2:
+        for playerId in g.players: g.setReady(playerId, True)
+        g.startLobby(rng)
+        for player in g.players.values(): player.identity = f"identity {player.id}"
+    return g
+
+async def main(count:int, players:int):
+    rng = random.Random(0)
+    config.Registry.maxGames = count
+    with tempfile.TemporaryDirectory() as directory:
+        store = persistence.STORE
+        await store.open(os.path.join(directory, "games.sqlite3"))
+
+        start = time.perf_counter()
+        for gameId in range(1, count + 1): createGame(gameId, players, rng)
+        print(f"create   {count} games in {(time.perf_counter() - start) * 1e3:8.1f} ms")
+
+        start = time.perf_counter()
+        batch = store.takeBatch()
+        await asyncio.get_running_loop().run_in_executor(store.executor, store.write, batch)
+        print(f"snapshot {len(batch[0])} games in {(time.perf_counter() - start) * 1e3:8.1f} ms, {sum(os.path.getsize(path) for path in (store.path, store.path + "-wal") if os.path.exists(path)) // 1024} KiB")
+
+        start = time.perf_counter()
+        snapshots = await store.load()
+        loaded = time.perf_counter()
+        game.GAMES.clear()
+        restored = game.restore(None, snapshots)
+        done = time.perf_counter()
+        assert sorted(snapshots, key=lambda data: data["id"]) == [game.GAMES[gameId].snapshot() for gameId in sorted(game.GAMES)]
+        print(f"restore  {restored} games in {(done - start) * 1e3:8.1f} ms (read {(loaded - start) * 1e3:.1f} ms, rebuild {(done - loaded) * 1e3:.1f} ms)")
+
+        store.path = None
+        store.executor.submit(store.connection.close).result()
+        timeouts.SCHEDULER.heap.clear()
+
+if __name__ == "__main__":
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 5000
+    players = int(sys.argv[2]) if len(sys.argv) > 2 else 6
+    asyncio.run(main(count, players))
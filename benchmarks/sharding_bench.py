@@ -0,0 +1,164 @@
+import asyncio
+import multiprocessing
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.chdir(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import config
+import modal
+import game
+import gamelog
+import persistence
+import sharding
+from replay import OfflineClient, OfflineGuild, Replay
+
+# workers restore their games from one shared snapshot table the way main.py does, then receive synthetic guild events
+# routed like the discord gateway routes them, an event whose game the receiving worker does not hold counts as misrouted
+
+class FakeObject:
+    def __init__(self, id:int):
+        self.id = id
+        self.channel = self
+
+    async def edit(self, **kwargs): pass
+
+class FakeClient(OfflineClient):
+    def get_partial_messageable(self, channelId:int) -> "FakeClient":
+        return self
+
+    def get_partial_message(self, messageId:int) -> FakeObject:
+        return FakeObject(messageId)
+
+class FakeShardInfo:
+    def __init__(self, shardId:int):
+        self.id = shardId
+        self.latency = 0.0
+
+    def is_closed(self) -> bool:
+        return False
+
+class FakeShardedClient:
+    def __init__(self, shardIds:list[int], shardCount:int, guilds:list[OfflineGuild]):
+        self.shards = {shardId: FakeShardInfo(shardId) for shardId in shardIds}
+        self.shard_count = shardCount
+        self.guilds = guilds
+
+def gatewayShard(guildId:int, shardCount:int) -> int:
+    # written out here rather than taken from sharding.py so a wrong formula there shows up as misrouted events
+    return (guildId >> 22) % shardCount
+
+def createGame(client, guildId:int, channelId:int, hostId:int) -> game.Game:
+    return game.Game(client, OfflineGuild(guildId), hostId=hostId, id=channelId, languageCode="en", gamemode="healing", vc=FakeObject(channelId), msg=FakeObject(channelId + 1))
+
+async def seed(path:str, channels:dict[int, list[int]]) -> list[int]:
+    # one waiting lobby in the first channel of every guild, written to the snapshot table all workers share
+    await persistence.STORE.open(path)
+    for guildId, channelIds in channels.items(): createGame(None, guildId, channelIds[0], guildId & 0xFFFFFF)
+    persistence.STORE.close()
+    game.GAMES.clear()
+    return [channelIds[0] for channelIds in channels.values()]
+
+async def stored(path:str) -> set[int]:
+    await persistence.STORE.open(path)
+    gameIds = {data["id"] for data in await persistence.STORE.load()}
+    persistence.STORE.close()
+    return gameIds
+
+async def work(directory:str, events:multiprocessing.Queue) -> tuple:
+    shardIds, shardCount = sharding.fromEnvironment()
+    client = FakeClient()
+    await persistence.STORE.open(os.path.join(directory, config.Persistence.path))
+    await gamelog.RECORDER.open(os.path.join(directory, sharding.workerPath(config.GameLog.path)))
+
+    start = time.perf_counter()
+    snapshots = sharding.owned(await persistence.STORE.load(), shardIds, shardCount)
+    game.restore(client, snapshots)
+    restoreTime = time.perf_counter() - start
+
+    handled, misrouted = 0, 0
+    loop = asyncio.get_running_loop()
+    start = time.perf_counter()
+    while (event := await loop.run_in_executor(None, events.get)) is not None:
+        kind, guildId, channelId, userId = event
+        g = game.GAMES.get(channelId)
+        if (g is None) != (kind == "host"): misrouted += 1; continue
+        handled += 1
+        match kind:
+            case "host": game.GAMES.add(createGame(client, guildId, channelId, userId))
+            case "join": g.add_player(userId)
+            case "cancel": await g.cancel("timeout")
+    elapsed = time.perf_counter() - start
+
+    guilds = [OfflineGuild(guildId) for guildId in {g.guildId for g in game.GAMES.values()}]
+    rows = sharding.summary(FakeShardedClient(shardIds, shardCount, guilds), game.GAMES)
+    return [data["id"] for data in snapshots], restoreTime, handled, misrouted, elapsed, sorted(game.GAMES), rows
+
+def worker(shards:range, shardCount:int, directory:str, events:multiprocessing.Queue, results:multiprocessing.Queue):
+    os.environ.update(sharding.environment(shards, shardCount))
+    config.Registry.maxGames = 1 << 20
+    report = asyncio.run(work(directory, events))
+    persistence.STORE.close()
+    gamelog.RECORDER.close()
+    results.put((shards, *report))
+
+def main(shardCount:int, processes:int, guildCount:int, eventCount:int):
+    config.Registry.maxGames = 1 << 20
+    rng = random.Random(0)
+    guildIds = [rng.getrandbits(63) for _ in range(guildCount)]
+    channels = {guildId: [rng.getrandbits(62) for _ in range(3)] for guildId in guildIds}
+    guildOf = {channelId: guildId for guildId, channelIds in channels.items() for channelId in channelIds}
+    channelIds = list(guildOf)
+    context = multiprocessing.get_context("spawn")
+
+    with tempfile.TemporaryDirectory() as directory:
+        live = set(asyncio.run(seed(os.path.join(directory, config.Persistence.path), channels)))
+        seeded = set(live)
+
+        ranges = sharding.partition(shardCount, processes)
+        queues = [context.Queue() for _ in ranges]
+        results = context.Queue()
+        workers = [context.Process(target=worker, args=(shards, shardCount, directory, queue, results)) for shards, queue in zip(ranges, queues)]
+        for process in workers: process.start()
+
+        owner = {shardId: index for index, shards in enumerate(ranges) for shardId in shards}
+        userIds = iter(range(1, 1 << 62))
+        start = time.perf_counter()
+        for _ in range(eventCount):
+            channelId = rng.choice(channelIds)
+            kind = "host" if channelId not in live else rng.choices(["join", "cancel"], [6, 1])[0]
+            if kind == "host": live.add(channelId)
+            elif kind == "cancel": live.discard(channelId)
+            queues[owner[gatewayShard(guildOf[channelId], shardCount)]].put((kind, guildOf[channelId], channelId, next(userIds)))
+        for queue in queues: queue.put(None)
+
+        reports = [results.get() for _ in workers]
+        for process in workers: process.join()
+        elapsed = time.perf_counter() - start
+
+        restored, remaining, failures = [], set(), 0
+        for shards, restoredIds, restoreTime, handled, misrouted, busy, gameIds, rows in sorted(reports, key=lambda report: report[0].start):
+            replay = Replay().run(gamelog.read(os.path.join(directory, sharding.workerPath(config.GameLog.path, list(shards)))))
+            restored += restoredIds
+            remaining.update(gameIds)
+            failures += misrouted + len(replay.mismatches)
+            print(f"worker {shards.start}-{shards.stop - 1}: restored {len(restoredIds)} games in {restoreTime * 1e3:.0f} ms, {handled} events, {misrouted} misrouted, {handled / busy if busy else 0:,.0f} events/s, game log {len(replay.finished)} ended with {len(replay.mismatches)} mismatches")
+            print(sharding.formatSummary(rows))
+
+        snapshotted = asyncio.run(stored(os.path.join(directory, config.Persistence.path)))
+
+    print(f"{len(seeded)} seeded games, {len(restored)} restored, {len(restored) - len(set(restored))} restored twice, {len(seeded - set(restored))} not restored")
+    print(f"{len(remaining)} games left in workers, {len(live)} expected, snapshot table holds {len(snapshotted)}, {len(snapshotted ^ remaining)} differ")
+    print(f"{eventCount} events across {len(workers)} workers in {elapsed:.2f}s")
+    # any misrouted event, replay mismatch or game restored, lost or stored differently fails the run
+    failures += len(restored) - len(set(restored)) + len(seeded - set(restored)) + len(snapshotted ^ remaining) + len(remaining ^ live)
+    if failures: print(f"FAILED: {failures} problems"); raise SystemExit(1)
+
+if __name__ == "__main__":
+    shardCount = int(sys.argv[1]) if len(sys.argv) > 1 else 8
+    processes = int(sys.argv[2]) if len(sys.argv) > 2 else 4
+    main(shardCount, processes, guildCount=2000, eventCount=int(sys.argv[3]) if len(sys.argv) > 3 else 20000)
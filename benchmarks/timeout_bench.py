@@ -0,0 +1,61 @@
+import asyncio
+import datetime
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import timeouts
+
+SLEEP_TIME = 1 # seconds, the interval of the old backgroundCleaner
+IDLE = 2 # seconds of idle time measured per game count
+
+class FakeGame:
+    def __init__(self, timeout:datetime.datetime):
+        self.timeout = timeout
+
+def pollingScan(games:dict) -> int:
+    # body of the removed backgroundCleaner loop, minus the cancel call
+    expired = 0
+    for gameId, game in list(games.items()):
+        if game.timeout is None: continue
+        elif game.timeout.timestamp()-datetime.datetime.now().timestamp() < SLEEP_TIME: expired += 1
+    return expired
+
+async def measureHeap(count:int) -> tuple[float, float, int]:
+    scheduler = timeouts.TimeoutScheduler()
+    later = datetime.datetime.now() + datetime.timedelta(hours=1)
+
+    start = time.perf_counter()
+    for gameId in range(count): scheduler.schedule(gameId, later)
+    scheduleTime = time.perf_counter() - start
+
+    expired = []
+    async def onExpire(gameId:int): expired.append(gameId)
+
+    cpuStart = time.process_time()
+    scheduler.start(onExpire)
+    await asyncio.sleep(IDLE)
+    idleCpu = time.process_time() - cpuStart
+
+    soon = datetime.datetime.now() + datetime.timedelta(seconds=0.1)
+    for gameId in range(count): scheduler.schedule(gameId, soon)
+    await asyncio.sleep(0.3)
+    scheduler.stop()
+    return scheduleTime, idleCpu, scheduler.wakeups if len(expired) == count else -1
+
+def measurePolling(count:int) -> float:
+    later = datetime.datetime.now() + datetime.timedelta(hours=1)
+    games = {gameId: FakeGame(later) for gameId in range(count)}
+    start = time.perf_counter()
+    pollingScan(games)
+    return time.perf_counter() - start
+
+if __name__ == "__main__":
+    counts = [int(arg) for arg in sys.argv[1:]] or [100, 1000, 10000, 100000]
+    print(f"{'games':>8} {'poll scan':>12} {'poll cpu/s':>12} {'heap insert':>12} {'heap idle cpu':>14} {'wakeups':>8}")
+    for count in counts:
+        scan = measurePolling(count)
+        scheduleTime, idleCpu, wakeups = asyncio.run(measureHeap(count))
+        print(f"{count:>8} {scan * 1e3:>10.2f}ms {scan / SLEEP_TIME * 1e3:>10.2f}ms {scheduleTime * 1e3:>10.2f}ms {idleCpu / IDLE * 1e3:>12.3f}ms {wakeups:>8}")
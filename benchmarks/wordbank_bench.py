@@ -0,0 +1,63 @@
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import guess
+import wordbank
+
+SYLLABLES:list[str] = ["mar", "tin", "lu", "ther", "king", "na", "po", "le", "on", "bo", "par", "te", "ein", "stein", "new", "ton", "cu", "rie", "skło", "dow", "żół"]
+
+def source(categories:int, words:int, rng:random.Random) -> dict:
+    return {f"category{c}": {"display": f"Category {c}", "words": [" ".join("".join(rng.choice(SYLLABLES) for _ in range(rng.randint(1, 3))).title() for _ in range(rng.randint(1, 3))) for _ in range(words)]} for c in range(categories)}
+
+def percentile(values:list[float], p:float) -> float:
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * p))]
+
+def main():
+    rng = random.Random(15)
+    data = source(8, 12500, rng)
+    with tempfile.TemporaryDirectory() as root:
+        sourcePath, target = os.path.join(root, "en.json"), os.path.join(root, "en.dwb")
+        with open(sourcePath, "w", encoding="utf-8") as f: json.dump(data, f)
+
+        start = time.perf_counter()
+        wordbank.build(sourcePath, target, "en")
+        print(f"build: {time.perf_counter() - start:.2f}s, {os.path.getsize(target) / 1024:.0f} KiB for {sum(len(c['words']) for c in data.values())} words")
+
+        start = time.perf_counter()
+        bank = wordbank.WordBank(target, "en")
+        print(f"open: {(time.perf_counter() - start) * 1000:.2f}ms")
+
+        # baseline, what a linear scan over the parsed json costs per keystroke
+        words = [(categoryId, word, guess.normalize(word, "en")) for categoryId, category in data.items() for word in category["words"]]
+        prefixes = [rng.choice(words)[2][:rng.randint(1, 4)] for _ in range(2000)]
+        categories = [rng.choice([None, *data.keys()]) for _ in prefixes]
+
+        start = time.perf_counter()
+        for prefix, categoryId in zip(prefixes[:200], categories):
+            [word for c, word, key in words if (categoryId is None or c == categoryId) and any(s.startswith(prefix) for s in wordbank.suffixes(key))][:25]
+        print(f"linear scan: {(time.perf_counter() - start) / 200 * 1e6:.0f}us per lookup")
+
+        samples = []
+        for prefix, categoryId in zip(prefixes, categories):
+            start = time.perf_counter()
+            bank.complete(prefix, categoryId)
+            samples.append(time.perf_counter() - start)
+        print(f"complete: p50 {percentile(samples, 0.5) * 1e6:.0f}us, p99 {percentile(samples, 0.99) * 1e6:.0f}us")
+
+        samples = []
+        for categoryId in categories:
+            start = time.perf_counter()
+            bank.suggest(categoryId, 3, rng)
+            samples.append(time.perf_counter() - start)
+        print(f"suggest: p50 {percentile(samples, 0.5) * 1e6:.0f}us, p99 {percentile(samples, 0.99) * 1e6:.0f}us")
+        bank.close()
+
+if __name__ == "__main__":
+    main()
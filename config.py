@@ -1,12 +1,17 @@
-class BackgroundCleaner:
-    sleepTime:int = 1  # seconds
-
 class Language:
     defaultCode:str = "en"
 
 class AssignmentModal:
     maxChars:int = 32
 
+class WordBank:
+    suggestions:int = 3  # ideas shown in the assignment modal
+    autocompleteLimit:int = 25  # discord shows at most 25 choices
+
+class Guess:
+    maxDistance:int = 2  # edits allowed between a guess and the identity
+    maxDistanceRatio:float = 0.2  # but never more than this share of the identity's length
+
 class NoteModal:
     class Question:
         maxChars:int = 32
@@ -14,4 +19,62 @@ class NoteModal:
         maxChars:int = 32
 
 class Game:
-    readyCountdown:int = 10  # seconds
\ No newline at end of file
+    readyCountdown:int = 10  # seconds
+
+class Assignment:
+    singleCycle:bool = False  # targets form one loop and the round order follows it
+
+class Registry:
+    maxGames:int = 1000  # live games, hosting another one is refused until one ends
+
+class RenderScheduler:
+    window:float = 0.25  # seconds
+
+class ChannelStatus:
+    minInterval:float = 5  # seconds between writes to the same channel
+
+class Persistence:
+    path:str = "games.sqlite3"
+    flushInterval:float = 1  # seconds a snapshot can wait before it is written
+
+class History:
+    path:str = "history.sqlite3"
+    flushInterval:float = 5  # seconds a finished game can wait before it is written
+    batchSize:int = 100  # finished games that force a write before the interval is up
+    leaderboardSize:int = 10
+
+class GameLog:
+    path:str = "gamelog.bin"  # append-only, replay.py rebuilds games from it, sharded workers each write their own
+    flushInterval:float = 1  # seconds a record can wait before it is written
+    bufferSize:int = 65536  # bytes that force a write before the interval is up
+
+class Sharding:
+    shardCount:int = 2  # total shards when started through launcher.py
+    processes:int = 2  # worker processes, each owns a contiguous range of shards
+    supervisorInterval:float = 5  # seconds between worker health checks in the launcher
+
+class Metrics:
+    host:str = "127.0.0.1"
+    port:int = 9464  # sharded workers add the first shard they own to it
+    deadline:float = 3  # seconds discord gives to acknowledge an interaction
+
+class Logging:
+    level:str = "INFO"
+    queueSize:int = 10000  # records waiting for the writer thread
+    sampleAbove:float = 0.5  # share of the queue after which records below warning are sampled
+    sampleRate:float = 0.1  # share of those records still kept
+    reserve:float = 0.1  # share of the queue only warnings and errors can use
+
+class Startup:
+    fingerprintPath:str = "commandtree.sha256"  # hash of the last command tree synced to discord
+
+class Outbound:
+    concurrency:int = 50  # scheduled REST calls in flight at once, interaction responses are never counted here
+    routeLimit:int = 5  # REST calls in flight per rate limit bucket until its headers say otherwise
+    routeLimits:dict = {"channel.edit_status": 1}  # routes with a smaller per bucket budget
+
+class Diagnostics:
+    leakAfter:float = 60  # seconds a removed game may stay reachable before it is reported
+    largestGames:int = 10  # games listed by memory
+    topAllocations:int = 10  # allocation sites listed while tracemalloc is tracing
+    traceFrames:int = 1  # frames kept per allocation
@@ -0,0 +1,88 @@
+import asyncio
+import gc
+import sys
+import time
+import tracemalloc
+import types
+import discord
+import discord.state
+import config
+
+# a game points at these without owning them, walking into them would count the whole client
+SHARED:tuple[type, ...] = (type, types.ModuleType, types.FunctionType, types.BuiltinFunctionType, discord.Client, discord.state.ConnectionState, discord.Guild, discord.abc.GuildChannel, asyncio.AbstractEventLoop)
+baseline:tracemalloc.Snapshot = None
+
+def boundary(games:list) -> set[int]:
+    # every game and module namespace, a walk from one game stops at them
+    return {id(game) for game in games} | {id(vars(module)) for module in list(sys.modules.values()) if module is not None}
+
+def footprint(game, seen:set[int]) -> int:
+    # approximate bytes reachable from the game without crossing into shared objects,
+    # seen is shared across games so anything two games reach is counted once
+    seen.discard(id(game))
+    pending = [game]
+    size = 0
+    while pending:
+        obj = pending.pop()
+        if id(obj) in seen or isinstance(obj, SHARED): continue
+        seen.add(id(obj))
+        size += sys.getsizeof(obj)
+        pending.extend(gc.get_referents(obj))
+    return size
+
+def describe(referrer) -> str:
+    if isinstance(referrer, types.FrameType): return f"frame {referrer.f_code.co_qualname}"
+    if isinstance(referrer, types.CoroutineType): return f"coroutine {referrer.__qualname__}"
+    return type(referrer).__qualname__
+
+def survivors(games) -> list[dict]:
+    # removed games still reachable after a full collection, with what holds them
+    gc.collect()
+    now = time.time()
+    found = []
+    entries = list(games.ended.items())
+    ignored = {id(entries), id(sys._getframe())} | {id(entry) for entry in entries}
+    for game, endedAt in entries:
+        if now - endedAt < config.Diagnostics.leakAfter: continue
+        # the game's own actor and renderer point back at it, that cycle alone would already have been collected
+        owned = {id(referent) for referent in gc.get_referents(game)}
+        holders = sorted({describe(referrer) for referrer in gc.get_referrers(game) if id(referrer) not in ignored and id(referrer) not in owned})
+        found.append({"id": game.id, "age": now - endedAt, "status": game.lobbyStatus, "holders": holders})
+    return found
+
+def allocations() -> list[tuple[str, int, int]]:
+    # top allocation sites since the previous report, tracemalloc has to be tracing
+    global baseline
+    if not tracemalloc.is_tracing(): return None
+    snapshot = tracemalloc.take_snapshot().filter_traces((tracemalloc.Filter(False, tracemalloc.__file__), tracemalloc.Filter(False, "<frozen importlib._bootstrap>")))
+    stats = snapshot.compare_to(baseline, "lineno") if baseline is not None else snapshot.statistics("lineno")
+    baseline = snapshot
+    return [(str(stat.traceback[0]), stat.size, getattr(stat, "size_diff", stat.size)) for stat in stats[:config.Diagnostics.topAllocations]]
+
+def summary(games) -> dict:
+    live = list(games.values())
+    seen = boundary(live)
+    sizes = sorted(((game.id, game.lobbyStatus, game.playerCount, footprint(game, seen)) for game in live), key=lambda row: row[3], reverse=True)
+    return {
+        "games": len(live),
+        "limit": config.Registry.maxGames,
+        "bytes": sum(row[3] for row in sizes),
+        "largest": sizes[:config.Diagnostics.largestGames],
+        "survivors": survivors(games),
+        "allocations": allocations(),
+    }
+
+def formatSummary(data:dict) -> str:
+    lines = [f"{data['games']}/{data['limit']} games, ~{data['bytes'] // 1024} KiB", f"{'game':>20} {'status':>8} {'players':>8} {'KiB':>7}"]
+    lines += [f"{gameId:>20} {status:>8} {players:>8} {size / 1024:>7.1f}" for gameId, status, players, size in data["largest"]]
+    lines.append(f"survivors: {len(data['survivors'])}")
+    lines += [f"{row['id']:>20} {row['status']:>8} {row['age']:>6.0f}s held by {', '.join(row['holders']) or '-'}" for row in data["survivors"]]
+    if data["allocations"] is None: lines.append("tracemalloc is off, //memory trace starts it")
+    else: lines += [f"{size / 1024:>9.1f} KiB {diff / 1024:>+9.1f} KiB {site}" for site, size, diff in data["allocations"]]
+    return "\n".join(lines)
+
+def trace(enabled:bool):
+    global baseline
+    baseline = None
+    if enabled and not tracemalloc.is_tracing(): tracemalloc.start(config.Diagnostics.traceFrames)
+    if not enabled and tracemalloc.is_tracing(): tracemalloc.stop()
@@ -0,0 +1,35 @@
+import discord
+import error
+import config
+from game import GAMES
+
+# custom_id prefix -> Game method, custom_ids look like "{action}-{gameId}"
+ROUTES:dict[str, str] = {
+    "join": "join_callback",
+    "leave": "leave_callback",
+    "settings": "settings_callback",
+    "language": "languageSelect_callback",
+    "ready": "ready_callback",
+    "start": "start_callback",
+    "open": "open_callback",
+    "confirm": "gameReady_callback",
+    "cancel": "gameReady_callback",
+    "change": "change_callback",
+    "quit": "quit_callback",
+    "note": "note_callback",
+    "guess": "guess_callback",
+}
+
+def parse(customId:str) -> tuple[str, int]:
+    action, _, gameId = customId.partition("-")
+    if action not in ROUTES or not gameId.isdigit(): return None, None
+    return action, int(gameId)
+
+async def dispatch(interaction:discord.Interaction):
+    if interaction.type != discord.InteractionType.component: return
+    action, gameId = parse(interaction.data.get("custom_id", ""))
+    if action is None: return
+
+    game = GAMES.get(gameId)
+    if game is None: await error.noGame(interaction, config.Language.defaultCode); return
+    await game.actor.call(getattr(game, ROUTES[action]), interaction)
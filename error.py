@@ -20,4 +20,10 @@ async def notHost(interaction: discord.Interaction, languageCode: str):
     return await send(interaction, "notHost", languageCode)
 
 async def notInGame(interaction: discord.Interaction, languageCode: str):
-    return await send(interaction, "notInGame", languageCode)
\ No newline at end of file
+    return await send(interaction, "notInGame", languageCode)
+
+async def inOtherGame(interaction: discord.Interaction, languageCode: str):
+    return await send(interaction, "inOtherGame", languageCode)
+
+async def tooManyGames(interaction: discord.Interaction, languageCode: str):
+    return await send(interaction, "tooManyGames", languageCode)
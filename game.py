@@ -1,22 +1,63 @@
 import discord
 import discord.ui as ui
-import error
+import guards
+import assignment
+import guess
 import modal
 import language
+import render
+import actor
+import outbound
+import status
+import timeouts
+import persistence
+import history
+import gamelog
+import metrics
+import log
 import random
 import asyncio
 import datetime
+import time
 import config
 
-GAMES:dict = {}
+from registry import GAMES
+
+class StaticView(ui.View):
+    # carries components only, their interactions are routed by dispatch.py instead of the view store
+    def __init__(self):
+        super().__init__(timeout=None)
+
+    def is_finished(self) -> bool:
+        return True
+
+    def is_dispatchable(self) -> bool:
+        return False
+
+class MessageRef:
+    # an ephemeral interaction response, only what editing or deleting it through the interaction webhook needs
+    __slots__ = ("id", "token")
+    id:int
+    token:str
+
+    def __init__(self, id:int, token:str):
+        self.id = id
+        self.token = token
+
+def interactionWebhook(client:discord.Client, token:str) -> discord.Webhook:
+    return discord.Webhook.partial(client.application_id, token, client=client)
 
 class Player:
+    __slots__ = ("id", "ready", "wantsToQuit", "identity", "matcher", "guesses", "guessed", "targetId", "gameMsg", "notes")
     id:int
     ready:bool
     wantsToQuit:bool
     identity:str
+    matcher:guess.Matcher
+    guesses:int
+    guessed:bool
     targetId:int
-    gameMsg:discord.Message
+    gameMsg:MessageRef
     notes:list[(str, str)]
 
     def __init__(self, id:int, ready:bool = False, identity:str = None):
@@ -24,6 +65,9 @@ class Player:
         self.ready = ready
         self.wantsToQuit = False
         self.identity = identity
+        self.matcher = None
+        self.guesses = 0
+        self.guessed = False
         self.targetId = None
         self.gameMsg = None
         self.notes = []
@@ -31,6 +75,29 @@ class Player:
     def __str__(self):
         return f"Player {self.id} - {self.ready} - {self.identity} - {self.targetId}"
 
+    def snapshot(self) -> list:
+        # gameMsg is an ephemeral interaction response, its token does not survive a restart so it is not stored
+        return [self.id, self.ready, self.wantsToQuit, self.identity, self.targetId, self.notes, self.guesses, self.guessed]
+
+    @classmethod
+    def fromSnapshot(cls, data:list) -> "Player":
+        player = cls(data[0], ready=data[1], identity=data[3])
+        player.wantsToQuit = data[2]
+        player.targetId = data[4]
+        player.notes = [(key, value) for key, value in data[5]]
+        if len(data) > 6: player.guesses, player.guessed = data[6], data[7]
+        return player
+
+    def setIdentity(self, identity:str, languageCode:str):
+        # normalized and indexed once here, every guess is then matched against the prepared pattern
+        self.identity = identity
+        self.matcher = guess.Matcher(identity, languageCode)
+
+    def getMatcher(self, languageCode:str) -> guess.Matcher:
+        # a restored player gets its matcher on the first guess, a restart does not normalize every identity up front
+        if self.matcher is None and self.identity is not None: self.matcher = guess.Matcher(self.identity, languageCode)
+        return self.matcher
+
     def addNote(self, key:str, value:str):
         self.notes.append((key, value))
 
@@ -41,8 +108,15 @@ class Player:
         return outStr[:-1]
 
 class Game:
+    # views hold custom ids only and discord objects are resolved from ids, so a game owns nothing but its own state
+    __slots__ = (
+        "client", "guildId", "players", "id", "hostId", "gamemode", "languageCode", "settings", "lobbyStatus", "gamePhase",
+        "roundIndex", "roundNumber", "roundDeadline", "startedAt", "playerCount", "readyCount", "quitCount", "neededToQuit", "winnerCount",
+        "vcId", "msgChannelId", "msgId", "timeoutExtension", "timeout", "readyCountdown", "roundOrder",
+        "views", "version", "renders", "renderVersion", "renderer", "actor", "_guild", "_vc", "_msg", "__weakref__",
+    )
     client:discord.Client
-    guild:discord.Guild
+    guildId:int
     players: dict[int, Player]
     id: int
     hostId: int
@@ -52,17 +126,27 @@ class Game:
     lobbyStatus: str # waiting, playing, finished
     gamePhase: str # assigning, round, 
     roundIndex: int
+    roundNumber: int # counts every round started, stale modals compare against it
+    roundDeadline: datetime.datetime
+    startedAt: float # when the lobby started playing, None while waiting
     playerCount: int
     readyCount: int
     quitCount: int
     neededToQuit: int
     winnerCount: int
-    vc: discord.VoiceChannel
-    msg: discord.Message
+    vcId: int
+    msgChannelId: int
+    msgId: int
     timeoutExtension: int
     timeout: datetime.datetime
     readyCountdown: asyncio.Task
     roundOrder: list[int]
+    views: dict[tuple, ui.View]
+    version: int
+    renders: dict[tuple, object]
+    renderVersion: tuple[int, int]
+    renderer: render.RenderScheduler
+    actor: actor.GameActor
     emojis: dict = {
         "ready": "🟢",
         "notReady": "⭕",
@@ -70,13 +154,14 @@ class Game:
         "order": {
             "match": "🔸",
             "noMatch": "▪️",
+            "guessed": "✅",
         }
     }
 
 
     def __init__(self, client:discord.Client, guild:discord.Guild, hostId:int, id:int, languageCode:str, gamemode:str, vc: discord.VoiceChannel, msg: discord.Message):
         self.client = client
-        self.guild = guild
+        self.guildId = guild.id
         self.players = {
             hostId: Player(hostId),
             #1306987007779541002: Player(1306987007779541002, ready=True) # for testing, bot itself
@@ -98,15 +183,107 @@ class Game:
         self.winnerCount = 0
         self.quitCount = 0
         self.neededToQuit = (self.playerCount) // 2 + 1
-        self.vc = vc
-        self.msg = msg
+        self.vcId = vc.id
+        self.msgChannelId = msg.channel.id
+        self.msgId = msg.id
         self.timeoutExtension = 60
         self.timeout = None
         self.readyCountdown = None
         self.roundOrder = None
+        self.roundIndex = 0
+        self.roundNumber = 0
+        self.roundDeadline = None
+        self.startedAt = None
+        self.setupRuntime(client, guild, vc, msg)
 
         self.extendTimeout()
         self.updateChannelStatus()
+        gamelog.RECORDER.snapshot(self, gamelog.CREATED)
+
+    def setupRuntime(self, client:discord.Client, guild:discord.Guild = None, vc:discord.VoiceChannel = None, msg:discord.Message = None):
+        self.client = client
+        self._guild = guild
+        self._vc = vc
+        self._msg = msg
+        self.views = {}
+        self.version = 0
+        self.renders = {}
+        self.renderVersion = None
+        self.renderer = render.RenderScheduler(self)
+        self.actor = actor.GameActor(self)
+
+    # discord objects are resolved from ids on first use, so restored games rebind lazily
+    @property
+    def guild(self) -> discord.Guild:
+        if self._guild is None: self._guild = self.client.get_guild(self.guildId)
+        return self._guild
+
+    @property
+    def vc(self) -> discord.VoiceChannel:
+        if self._vc is None: self._vc = self.client.get_channel(self.vcId)
+        return self._vc
+
+    @property
+    def msg(self) -> discord.Message:
+        if self._msg is None: self._msg = self.client.get_partial_messageable(self.msgChannelId).get_partial_message(self.msgId)
+        return self._msg
+
+    def snapshot(self) -> dict:
+        return {
+            "id": self.id,
+            "guildId": self.guildId,
+            "vcId": self.vcId,
+            "msg": [self.msgChannelId, self.msgId],
+            "hostId": self.hostId,
+            "gamemode": self.gamemode,
+            "languageCode": self.languageCode,
+            "settings": self.settings,
+            "lobbyStatus": self.lobbyStatus,
+            "gamePhase": self.gamePhase,
+            "roundIndex": self.roundIndex,
+            "roundOrder": self.roundOrder,
+            "roundNumber": self.roundNumber,
+            "roundDeadline": None if self.roundDeadline is None else self.roundDeadline.timestamp(),
+            "startedAt": self.startedAt,
+            "counts": [self.playerCount, self.readyCount, self.winnerCount, self.quitCount, self.neededToQuit],
+            "timeoutExtension": self.timeoutExtension,
+            "timeout": None if self.timeout is None else self.timeout.timestamp(),
+            "readyCountdown": None if self.readyCountdown is None else int(self.readyCountdown.get_name()),
+            "players": [player.snapshot() for player in self.players.values()],
+        }
+
+    @classmethod
+    def fromSnapshot(cls, client:discord.Client, data:dict) -> "Game":
+        game = cls.__new__(cls)
+        game.id = data["id"]
+        game.guildId = data["guildId"]
+        game.vcId = data["vcId"]
+        game.msgChannelId, game.msgId = data["msg"]
+        game.hostId = data["hostId"]
+        game.gamemode = data["gamemode"]
+        game.languageCode = data["languageCode"]
+        game.settings = data["settings"]
+        game.lobbyStatus = data["lobbyStatus"]
+        game.gamePhase = data["gamePhase"]
+        game.roundIndex = data["roundIndex"]
+        game.roundOrder = data["roundOrder"]
+        game.roundNumber = data.get("roundNumber", 0)
+        game.roundDeadline = None if data.get("roundDeadline") is None else datetime.datetime.fromtimestamp(data["roundDeadline"])
+        game.startedAt = data.get("startedAt")
+        game.playerCount, game.readyCount, game.winnerCount, game.quitCount, game.neededToQuit = data["counts"]
+        game.timeoutExtension = data["timeoutExtension"]
+        game.timeout = None if data["timeout"] is None else datetime.datetime.fromtimestamp(data["timeout"])
+        game.players = {player[0]: Player.fromSnapshot(player) for player in data["players"]}
+        game.readyCountdown = None
+        game.setupRuntime(client)
+
+        if game.timeout is not None: timeouts.SCHEDULER.schedule(game.id, game.timeout)
+        if game.roundDeadline is not None: timeouts.ROUNDS.schedule(game.id, game.roundDeadline)
+        if data["readyCountdown"] is not None:
+            seconds = max(0, data["readyCountdown"] - datetime.datetime.now().timestamp())
+            game.readyCountdown = asyncio.create_task(game.startReadyCountdown(seconds))
+            game.readyCountdown.set_name(str(data["readyCountdown"]))
+        return game
 
     def getPlayersString(self, withReady:bool=True) -> str:
         outStr:str = ""
@@ -117,6 +294,8 @@ class Game:
 
     def extendTimeout(self):
         self.timeout = datetime.datetime.now() + datetime.timedelta(seconds=self.timeoutExtension)
+        timeouts.SCHEDULER.schedule(self.id, self.timeout)
+        self.touch()
 
     def updateChannelStatus(self):
         langChannel = language.getModule("channel", self.languageCode)
@@ -127,74 +306,144 @@ class Game:
             case "playing":
                 message = f"{self.emojis["playing"]} {langChannel["playing"]} ({self.winnerCount}/{self.playerCount})"
 
-        asyncio.create_task(self.vc.edit(status=message))
+        if self.vc is not None: status.WRITER.set(self.vc, message)
 
     def setLanguage(self, languageCode:str):
         self.languageCode = languageCode.lower()
+        self.record(gamelog.LANGUAGE, self.languageCode)
+        self.touch()
         self.updateChannelStatus()
 
     def isPlayer(self, playerId:int) -> bool:
         return self.players.get(playerId) is not None
 
     def add_player(self, playerId:int):
+        self.record(gamelog.JOINED, playerId)
         self.players[playerId] = Player(playerId)
         self.playerCount += 1
+        GAMES.addPlayer(self, playerId)
+        self.touch()
         self.updateChannelStatus()
         self.neededToQuit = (self.playerCount) // 2 + 1
 
     def remove_player(self, playerId:int):
+        self.record(gamelog.LEFT, playerId)
         self.players.pop(playerId)
         self.playerCount -= 1
+        GAMES.removePlayer(self, playerId)
+        self.touch()
         self.updateChannelStatus()
         self.neededToQuit = (self.playerCount) // 2 + 1
 
     def quit(self, playerId:int):
         self.remove_player(playerId)
         self.roundOrder.remove(playerId)
+        self.touch()
 
     def setReady(self, playerId:int, ready:bool):
+        self.record(gamelog.READY, playerId, ready)
         self.players[playerId].ready = ready
         self.readyCount += 1 if ready else -1
+        self.touch()
         self.updateChannelStatus()
 
     def setQuit(self, playerId:int, wantsToQuit:bool):
+        self.record(gamelog.QUIT_VOTE, playerId, wantsToQuit)
         self.players[playerId].wantsToQuit = wantsToQuit
         self.quitCount += 1 if wantsToQuit else -1
         self.neededToQuit = (self.playerCount) // 2 + 1
-
-    def startLobby(self):
+        self.touch()
+
+    def setSettings(self, maxGuesses:int, timeLimit:int, category:str):
+        self.record(gamelog.SETTINGS, maxGuesses, timeLimit, category)
+        self.settings["maxGuesses"] = maxGuesses
+        self.settings["timeLimit"] = timeLimit
+        self.settings["category"] = category
+        self.touch()
+
+    def startLobby(self, rng:random.Random = random, seed:int = None):
+        # targets are drawn from a seed of their own, the game log keeps it so a replay deals the same ones
+        if seed is None: seed = rng.getrandbits(63)
+        rng = random.Random(seed)
+        self.record(gamelog.STARTED, seed)
         self.lobbyStatus = "playing"
         self.gamePhase = "assigning"
+        self.startedAt = time.time()
         self.timeout = None
+        timeouts.SCHEDULER.cancel(self.id)
 
         players = [player.id for player in self.players.values()]
-        targets = players.copy()
-        
-        while True:
-            random.shuffle(targets)
-            if all([player != target for player, target in zip(players, targets)]): break
-        
-        self.roundOrder = targets.copy()
 
-        for playerId, targetId in zip(players, targets):
-            self.players[playerId].targetId = targetId
-            self.setReady(playerId, False)
+        if config.Assignment.singleCycle:
+            targets = assignment.singleCycle(players, rng)
+            self.roundOrder = assignment.cycleOrder(targets, players[0])
+        else:
+            targets = assignment.derangement(players, rng)
+            self.roundOrder = [targets[playerId] for playerId in players]
+
+        for playerId in players:
+            self.players[playerId].targetId = targets[playerId]
+            self.players[playerId].ready = False
+        self.readyCount = 0
 
+        self.touch()
         self.updateChannelStatus()
 
     async def cancel(self, reason:str):
+        if self.lobbyStatus == "finished": return
+        start = time.perf_counter()
+        # out of routing first, clicks arriving during teardown already see no game
+        registered = GAMES.remove(self)
+
         if self.readyCountdown is not None: self.readyCountdown.cancel()
-        if self.lobbyStatus == "playing":
-            for player in self.players.values():
-                if player.gameMsg is not None: await player.gameMsg.delete()
+        timeouts.SCHEDULER.cancel(self.id)
+        timeouts.ROUNDS.cancel(self.id)
+        self.renderer.close()
+        self.actor.close()
+
+        messages = [player.gameMsg for player in self.players.values() if player.gameMsg is not None] if self.lobbyStatus == "playing" else []
+        for player in self.players.values(): player.gameMsg = None
 
+        if self.startedAt is not None: history.STORE.append(self, reason, time.time())
         self.lobbyStatus = "finished"
+        self.record(gamelog.ENDED, reason, gamelog.digest(self) if gamelog.RECORDER.enabled else 0)
+        self.touch()
+        if registered: persistence.STORE.discard(self.id)
         self.updateChannelStatus()
-        await self.msg.edit(embed=self.cancelledEmbed(reason), view=None)
-        GAMES.pop(self.id)
-        del self
+
+        async def request(priority:int, route:str, bucket:int, factory):
+            try: await outbound.SCHEDULER.run(priority, route, bucket, factory)
+            except discord.NotFound: pass
+            except discord.HTTPException as e: log.warning("teardown request failed", error=str(e), **log.gameFields(self))
+
+        embed = self.cancelledEmbed(reason)
+        await asyncio.gather(request(outbound.LOBBY_MESSAGE, "channel.edit_message", self.msgId, lambda: self.msg.edit(embed=embed, view=None)), *(request(outbound.GAME_MESSAGE, "webhook.delete_message", message.id, lambda message=message: self.deleteGameMessage(message)) for message in messages))
+        # whatever still holds the finished game, an open modal for example, keeps only its plain state alive
+        self._guild, self._vc, self._msg = None, None, None
+        self.views.clear()
+        self.renders.clear()
+        metrics.observe("dementia_teardown_seconds", reason, time.perf_counter() - start)
+
+    def touch(self):
+        self.version += 1
+        # a finished game must not write over the snapshot of a newer game in the same channel
+        if self.lobbyStatus != "finished": persistence.STORE.markDirty(self)
+
+    def record(self, kind:int, *values):
+        gamelog.RECORDER.record(self.id, kind, *values)
+
+    def cached(self, key:tuple, build):
+        # renders are only valid for the state version and language catalog they were built from
+        if self.renderVersion != (self.version, language.generation()):
+            self.renders.clear()
+            self.renderVersion = (self.version, language.generation())
+        if key not in self.renders: self.renders[key] = build()
+        return self.renders[key]
 
     def lobbyEmbed(self) -> discord.Embed:
+        return self.cached(("lobby",), self.buildLobbyEmbed)
+
+    def buildLobbyEmbed(self) -> discord.Embed:
         langLobby = language.getModule("lobby", self.languageCode)
         langGamemodes = language.getModule("gamemodes", self.languageCode)
 
@@ -206,7 +455,8 @@ class Game:
         if self.lobbyStatus == "waiting": description += f"\n{langLobby["fields"]["timeout"]}: <t:{int(self.timeout.timestamp())}:R>"
 
         match self.lobbyStatus:
-            case "waiting": color = discord.Color.from_rgb(random.randint(0, 255), random.randint(0, 255), random.randint(0, 255))
+            # seeded by the game so the color stays the same across renders and unchanged lobbies hash equal
+            case "waiting": color = discord.Color.from_rgb(*random.Random(self.id).choices(range(256), k=3))
             case "playing": color = discord.Color.blurple()
             case "finished": color = discord.Color.green()
 
@@ -234,289 +484,365 @@ class Game:
         return embed
     
     def lobbyView(self) -> ui.View:
+        startDisabled = self.readyCount != self.playerCount or self.playerCount < 2
+        key = ("lobby", self.languageCode, language.generation(), self.lobbyStatus, startDisabled)
+        if key in self.views: return self.views[key]
+
         langLobby = language.getModule("lobby", self.languageCode)
         langCodes = language.getCodes()
 
-        view = ui.View(timeout=None)
+        view = StaticView()
 
         match self.lobbyStatus:
             case "waiting":
-                joinButton = ui.Button(style=discord.ButtonStyle.green, label=langLobby["buttons"]["join"], custom_id=f"join-{self.id}")
-                leaveButton = ui.Button(style=discord.ButtonStyle.red, label=langLobby["buttons"]["leave"], custom_id=f"leave-{self.id}")
-                async def joinleave_callback(interaction:discord.Interaction):
-                    method:str = interaction.data["custom_id"].split("-")[0]
-                    gameId:int = int(interaction.data["custom_id"].split("-")[1])
-                    if (interaction.user.voice is None): await error.noVoice(interaction, self.languageCode); return
-                    if (interaction.user.voice.channel.id not in GAMES): await error.noGame(interaction, self.languageCode); return
-                    if (interaction.user.voice.channel.id != gameId): await error.wrongVoice(interaction, self.languageCode); return
-
-                    match method:
-                        case "join":
-                            if self.isPlayer(interaction.user.id): await interaction.response.defer(); return
-                            else:
-                                self.add_player(interaction.user.id)
-                                await interaction.response.edit_message(embed=self.lobbyEmbed(), view=self.lobbyView())
-                        case "leave":
-                            if self.hostId == interaction.user.id:
-                                await interaction.response.defer()
-                                await self.cancel("byHost")
-                            else:
-                                self.remove_player(interaction.user.id)
-                                await interaction.response.edit_message(embed=self.lobbyEmbed(), view=self.lobbyView())
-
-                joinButton.callback = joinleave_callback
-                leaveButton.callback = joinleave_callback
-
-                settingsButton = ui.Button(emoji="<a:settings:1308796814106955776>", label=langLobby["buttons"]["settings"], custom_id=f"settings-{self.id}")
-                async def settings_callback(interaction:discord.Interaction):
-                    gameId:int = int(interaction.data["custom_id"].split("-")[1])
-                    if (interaction.user.id != self.hostId): await error.notHost(interaction, self.languageCode); return
-                    if (interaction.user.voice is None): await error.noVoice(interaction, self.languageCode); return
-                    if (interaction.user.voice.channel.id not in GAMES): await error.noGame(interaction, self.languageCode); return
-                    if (interaction.user.voice.channel.id != gameId): await error.wrongVoice(interaction, self.languageCode); return
-
-                    self.extendTimeout()
-                    await interaction.response.send_modal(modal.SettingsModal(self, langLobby))
-
-                settingsButton.callback = settings_callback
-
                 languageSelect = ui.Select(placeholder=langLobby["buttons"]["language"], custom_id=f"language-{self.id}")
                 for langCode in langCodes[self.languageCode]:
                     languageSelect.add_option(label=langCodes[self.languageCode][langCode], value=langCode)
 
-                async def languageSelect_callback(interaction:discord.Interaction):
-                    gameId:int = int(interaction.data["custom_id"].split("-")[1])
-                    language = interaction.data["values"][0]
-                    if (interaction.user.id != self.hostId): await error.notHost(interaction, self.languageCode); return
-                    if (interaction.user.voice is None): await error.noVoice(interaction, self.languageCode); return
-                    if (interaction.user.voice.channel.id not in GAMES): await error.noGame(interaction, self.languageCode); return
-                    if (interaction.user.voice.channel.id != gameId): await error.wrongVoice(interaction, self.languageCode); return
-
-                    if language == self.languageCode: await interaction.response.defer(); return
-
-                    self.setLanguage(language)
-                    self.extendTimeout()
-                    embed = self.lobbyEmbed()
-                    await interaction.response.edit_message(embed=embed, view=self.lobbyView())
-
-                languageSelect.callback = languageSelect_callback
-
-                readyButton = ui.Button(style=discord.ButtonStyle.blurple, label=langLobby["buttons"]["ready"], custom_id=f"ready-{self.id}")
-                async def ready_callback(interaction:discord.Interaction):
-                    gameId:int = int(interaction.data["custom_id"].split("-")[1])
-                    if (not self.isPlayer(interaction.user.id)): await error.notInGame(interaction, self.languageCode); return
-                    if (interaction.user.voice is None): await error.noVoice(interaction, self.languageCode); return
-                    if (interaction.user.voice.channel.id not in GAMES): await error.noGame(interaction, self.languageCode); return
-                    if (interaction.user.voice.channel.id != gameId): await error.wrongVoice(interaction, self.languageCode); return
-
-                    self.setReady(interaction.user.id, not self.players[interaction.user.id].ready)
-                    self.extendTimeout()
-                    await interaction.response.edit_message(embed=self.lobbyEmbed(), view=self.lobbyView())
-
-                readyButton.callback = ready_callback
-
-                startButton = ui.Button(style=discord.ButtonStyle.blurple, label="Start", custom_id=f"start-{self.id}")
-                async def start_callback(interaction:discord.Interaction):
-                    gameId:int = int(interaction.data["custom_id"].split("-")[1])
-                    if (interaction.user.id != self.hostId): await error.notHost(interaction, self.languageCode); return
-                    if (interaction.user.voice is None): await error.noVoice(interaction, self.languageCode); return
-                    if (interaction.user.voice.channel.id not in GAMES): await error.noGame(interaction, self.languageCode); return
-                    if (interaction.user.voice.channel.id != gameId): await error.wrongVoice(interaction, self.languageCode); return
-
-                    self.startLobby()
-                    await interaction.response.edit_message(embed=self.lobbyEmbed(), view=self.lobbyView())
-
-                startButton.callback = start_callback
-                if (self.readyCount != self.playerCount or self.playerCount < 2): startButton.disabled = True
-
-                view.add_item(joinButton)
-                view.add_item(settingsButton)
-                view.add_item(leaveButton)
-                view.add_item(readyButton)
-                view.add_item(startButton)
+                view.add_item(ui.Button(style=discord.ButtonStyle.green, label=langLobby["buttons"]["join"], custom_id=f"join-{self.id}"))
+                view.add_item(ui.Button(emoji="<a:settings:1308796814106955776>", label=langLobby["buttons"]["settings"], custom_id=f"settings-{self.id}"))
+                view.add_item(ui.Button(style=discord.ButtonStyle.red, label=langLobby["buttons"]["leave"], custom_id=f"leave-{self.id}"))
+                view.add_item(ui.Button(style=discord.ButtonStyle.blurple, label=langLobby["buttons"]["ready"], custom_id=f"ready-{self.id}"))
+                view.add_item(ui.Button(style=discord.ButtonStyle.blurple, label="Start", custom_id=f"start-{self.id}", disabled=startDisabled))
                 view.add_item(languageSelect)
 
             case "playing":
-                openButton = ui.Button(style=discord.ButtonStyle.blurple, label=langLobby["buttons"]["openGame"], custom_id=f"open-{self.id}")
-                async def open_callback(interaction:discord.Interaction):
-                    gameId:int = int(interaction.data["custom_id"].split("-")[1])
-                    if (not self.isPlayer(interaction.user.id)): await error.notInGame(interaction, self.languageCode); return
-                    if (interaction.user.voice is None): await error.noVoice(interaction, self.languageCode); return
-                    if (interaction.user.voice.channel.id not in GAMES): await error.noGame(interaction, self.languageCode); return
-                    if (interaction.user.voice.channel.id != gameId): await error.wrongVoice(interaction, self.languageCode); return
+                view.add_item(ui.Button(style=discord.ButtonStyle.blurple, label=langLobby["buttons"]["openGame"], custom_id=f"open-{self.id}"))
 
-                    targetPlayerId = self.players[interaction.user.id].targetId
-                    unassignedPlayers = [player.id for player in self.players.values() if player.identity is None]
+        self.views[key] = view
+        return view
 
-                    if targetPlayerId in unassignedPlayers:
-                        await interaction.response.send_modal(modal.AssignmentModal(self, interaction.user.id, targetPlayerId))
-                    else:
-                        await interaction.response.send_message(embed=self.gameEmbed(interaction.user.id), view=self.gameView(interaction.user.id), ephemeral=True)
-                        await self.players[interaction.user.id].gameMsg.delete()
-                        self.players[interaction.user.id].gameMsg = await interaction.original_response()
+    @metrics.instrument("join")
+    async def join_callback(self, interaction:discord.Interaction):
+        if not await guards.check(interaction, self, guards.inLobby, guards.inVoice, guards.notInOtherGame): return
 
-                openButton.callback = open_callback
+        if self.isPlayer(interaction.user.id): await interaction.response.defer(); return
+        self.add_player(interaction.user.id)
+        await self.respondLobby(interaction)
 
-                view.add_item(openButton)
+    @metrics.instrument("leave")
+    async def leave_callback(self, interaction:discord.Interaction):
+        if not await guards.check(interaction, self, guards.inLobby, guards.inVoice): return
 
-        return view
+        if self.hostId == interaction.user.id:
+            await interaction.response.defer()
+            await self.cancel("byHost")
+        elif not self.isPlayer(interaction.user.id): await interaction.response.defer()
+        else:
+            self.remove_player(interaction.user.id)
+            await self.respondLobby(interaction)
+
+    @metrics.instrument("settings")
+    async def settings_callback(self, interaction:discord.Interaction):
+        if not await guards.check(interaction, self, guards.inLobby, guards.isHost, guards.inVoice): return
+
+        self.extendTimeout()
+        await interaction.response.send_modal(modal.SettingsModal(self, language.getModule("lobby", self.languageCode)))
+
+    @metrics.instrument("language")
+    async def languageSelect_callback(self, interaction:discord.Interaction):
+        languageCode = interaction.data["values"][0]
+        if not await guards.check(interaction, self, guards.inLobby, guards.isHost, guards.inVoice): return
+
+        if languageCode == self.languageCode: await interaction.response.defer(); return
+
+        self.setLanguage(languageCode)
+        self.extendTimeout()
+        await self.respondLobby(interaction)
+
+    @metrics.instrument("ready")
+    async def ready_callback(self, interaction:discord.Interaction):
+        if not await guards.check(interaction, self, guards.inLobby, guards.isPlayer, guards.inVoice): return
+
+        self.setReady(interaction.user.id, not self.players[interaction.user.id].ready)
+        self.extendTimeout()
+        await self.respondLobby(interaction)
+
+    @metrics.instrument("start")
+    async def start_callback(self, interaction:discord.Interaction):
+        if not await guards.check(interaction, self, guards.inLobby, guards.isHost, guards.inVoice): return
+        if self.readyCount != self.playerCount or self.playerCount < 2: await interaction.response.defer(); return
+
+        self.startLobby()
+        await self.respondLobby(interaction)
+
+    @metrics.instrument("open")
+    async def open_callback(self, interaction:discord.Interaction):
+        if not await guards.check(interaction, self, guards.isPlayer, guards.inVoice): return
+
+        player = self.players[interaction.user.id]
+        targetPlayer = self.players[player.targetId]
+
+        if targetPlayer.identity is None:
+            await interaction.response.send_modal(modal.AssignmentModal(self, player.id, targetPlayer.id))
+        else: await self.sendGameMessage(interaction, player.id)
+
+    async def respondLobby(self, interaction:discord.Interaction):
+        # answers an interaction on the lobby message, a payload equal to the one it already shows is not sent again
+        embed, view = self.lobbyEmbed(), self.lobbyView()
+        payload = render.digest(embed, view)
+        if self.renderer.unchanged("lobby", payload): await interaction.response.defer(); return
+        await interaction.response.edit_message(embed=embed, view=view)
+        self.renderer.payloads["lobby"] = payload
+
+    async def sendGameMessage(self, interaction:discord.Interaction, playerId:int):
+        player = self.players[playerId]
+        embed, view = self.gameEmbed(playerId), self.gameView(playerId)
+        await interaction.response.send_message(embed=embed, view=view, ephemeral=True)
+        previous = player.gameMsg
+        if previous is not None: await outbound.SCHEDULER.run(outbound.GAME_MESSAGE, "webhook.delete_message", previous.id, lambda: self.deleteGameMessage(previous))
+        player.gameMsg = MessageRef((await interaction.original_response()).id, interaction.token)
+        self.renderer.payloads[playerId] = render.digest(embed, view)
+
+    async def editGameMessage(self, message:MessageRef, embed:discord.Embed, view:ui.View):
+        await interactionWebhook(self.client, message.token).edit_message(message.id, embed=embed, view=view)
+
+    async def deleteGameMessage(self, message:MessageRef):
+        await interactionWebhook(self.client, message.token).delete_message(message.id)
+
+    def assignIdentity(self, targetId:int, identity:str):
+        self.record(gamelog.IDENTITY, targetId, identity)
+        self.players[targetId].setIdentity(identity, self.languageCode)
+        self.touch()
+
+    def addNote(self, playerId:int, question:str, answer:str):
+        self.record(gamelog.NOTE, playerId, question, answer)
+        self.players[playerId].addNote(question, answer)
 
     def startGame(self):
+        self.record(gamelog.ROUND_STARTED)
         self.gamePhase = "round"
         self.roundIndex = 0
+        self.startRoundClock()
+        self.touch()
         self.updateGameMessage()
 
     def nextRound(self):
-        self.roundIndex = (self.roundIndex + 1) % len(self.roundOrder)
+        self.record(gamelog.NEXT_ROUND)
+        # players who already guessed their identity no longer take turns
+        for _ in range(len(self.roundOrder)):
+            self.roundIndex = (self.roundIndex + 1) % len(self.roundOrder)
+            if not self.players[self.roundOrder[self.roundIndex]].guessed: break
+        self.startRoundClock()
+        self.touch()
         self.updateGameMessage()
 
-    def gameEmbed(self, userId:int) -> discord.Embed:
+    def startRoundClock(self):
+        # one heap entry per running round, the embed shows a relative timestamp instead of ticking
+        self.roundNumber += 1
+        if self.settings["timeLimit"] > 0:
+            self.roundDeadline = datetime.datetime.now() + datetime.timedelta(seconds=self.settings["timeLimit"])
+            timeouts.ROUNDS.schedule(self.id, self.roundDeadline)
+        else:
+            self.roundDeadline = None
+            timeouts.ROUNDS.cancel(self.id)
+
+    def gameParts(self) -> dict:
+        return self.cached(("game",), self.buildGameParts)
+
+    def buildGameParts(self) -> dict:
+        # everything in the game embed that is the same for all viewers of this state
         langGame = language.getModule("game", self.languageCode)
-        
-        embed = discord.Embed()
-        
+        parts = {}
+
         match self.gamePhase:
             case "assigning":
-                embed.title = langGame["assigningPhase"]["title"]
-                description = langGame["assigningPhase"]["description"].format(f"<@{self.players[userId].targetId}>")
-                
-                if self.readyCountdown is not None: description += f"\n{langGame["assigningPhase"]["allReady"].format(f"<t:{self.readyCountdown.get_name()}:R>")}"
-                
-                embed.description = description
-
-                playersMessage = ""
+                parts["title"] = langGame["assigningPhase"]["title"]
+                parts["description"] = langGame["assigningPhase"]["description"]
+                parts["countdown"] = f"\n{langGame["assigningPhase"]["allReady"].format(f"<t:{self.readyCountdown.get_name()}:R>")}" if self.readyCountdown is not None else ""
 
+                rows, hidden, index = [], {}, {}
                 for playerId in self.roundOrder:
                     player = self.players[playerId]
-                    playersMessage += f"{self.emojis['ready'] if player.ready else self.emojis['notReady']} <@{player.id}> - "
-                    playersMessage += "||???||" if player.id == userId or player.identity == None else player.identity
-                    playersMessage += "\n"
-
-                playersMessage = playersMessage[:-1]
+                    prefix = f"{self.emojis['ready'] if player.ready else self.emojis['notReady']} <@{player.id}> - "
+                    index[playerId] = len(rows)
+                    hidden[playerId] = prefix + "||???||"
+                    rows.append(hidden[playerId] if player.identity == None else prefix + player.identity)
 
-                embed.add_field(name=f"{langGame["assigningPhase"]["fields"]["players"]} ({self.readyCount}/{self.playerCount})", value=playersMessage, inline=False)
+                parts["rows"], parts["hidden"], parts["index"] = rows, hidden, index
+                parts["players"] = f"{langGame["assigningPhase"]["fields"]["players"]} ({self.readyCount}/{self.playerCount})"
             case "round":
                 currentRoundPlayer:Player = self.players[self.roundOrder[self.roundIndex]]
-                player = self.players[userId]
-                embed.title = langGame["roundPhase"]["title"].format(self.guild.get_member(currentRoundPlayer.id).display_name)
-                
-                identity = currentRoundPlayer.identity if currentRoundPlayer.id != userId else "???"
-                embed.add_field(name=langGame["roundPhase"]["fields"]["identity"], value=identity, inline=False)
+                parts["currentId"] = currentRoundPlayer.id
+                parts["title"] = langGame["roundPhase"]["title"].format(self.guild.get_member(currentRoundPlayer.id).display_name)
+                parts["identityName"] = langGame["roundPhase"]["fields"]["identity"]
+                parts["identity"] = currentRoundPlayer.identity
 
                 orderMessage = ""
-                for userId in self.roundOrder:
-                    orderMessage += self.emojis["order"]["match"] if currentRoundPlayer.id == userId else self.emojis["order"]["noMatch"]
-                    orderMessage += f" <@{userId}>\n"
-                orderMessage = orderMessage[:-1]
+                for playerId in self.roundOrder:
+                    if self.players[playerId].guessed: orderMessage += self.emojis["order"]["guessed"]
+                    else: orderMessage += self.emojis["order"]["match"] if currentRoundPlayer.id == playerId else self.emojis["order"]["noMatch"]
+                    orderMessage += f" <@{playerId}>\n"
 
-                embed.add_field(name=langGame["roundPhase"]["fields"]["order"], value=orderMessage, inline=False)
+                parts["orderName"] = langGame["roundPhase"]["fields"]["order"]
+                parts["order"] = orderMessage[:-1]
+                parts["notesName"] = langGame["roundPhase"]["fields"]["notes"]
+                parts["deadline"] = langGame["roundPhase"]["deadline"].format(f"<t:{int(self.roundDeadline.timestamp())}:R>") if self.roundDeadline is not None else None
 
-                embed.add_field(name=langGame["roundPhase"]["fields"]["notes"], value=player.getNotesString(), inline=False)
+        return parts
+
+    def gameEmbed(self, userId:int) -> discord.Embed:
+        parts = self.gameParts()
+        embed = discord.Embed()
+
+        match self.gamePhase:
+            case "assigning":
+                embed.title = parts["title"]
+                embed.description = parts["description"].format(f"<@{self.players[userId].targetId}>") + parts["countdown"]
+
+                rows = parts["rows"]
+                if userId in parts["index"]:
+                    rows = rows.copy()
+                    rows[parts["index"][userId]] = parts["hidden"][userId]
+
+                embed.add_field(name=parts["players"], value="\n".join(rows), inline=False)
+            case "round":
+                embed.title = parts["title"]
+                embed.description = parts["deadline"]
+                embed.add_field(name=parts["identityName"], value=parts["identity"] if parts["currentId"] != userId else "???", inline=False)
+                embed.add_field(name=parts["orderName"], value=parts["order"], inline=False)
+                embed.add_field(name=parts["notesName"], value=self.players[userId].getNotesString(), inline=False)
 
         return embed
 
     def gameView(self, userId:int) -> ui.View:
+        player = self.players[userId]
+        isCurrent = self.gamePhase == "round" and userId == self.roundOrder[self.roundIndex]
+        match self.gamePhase:
+            case "assigning": key = ("assigning", self.languageCode, language.generation(), player.ready, player.wantsToQuit, self.quitCount, self.neededToQuit)
+            case "round": key = ("round", self.languageCode, language.generation(), isCurrent)
+            case _: key = (self.gamePhase,)
+        if key in self.views: return self.views[key]
+
         langGame = language.getModule("game", self.languageCode)
-        view = ui.View(timeout=None)
-        
+        view = StaticView()
+
         match self.gamePhase:
             case "assigning":
-                player = self.players[userId]
-
                 style = discord.ButtonStyle.green if not player.ready else discord.ButtonStyle.red
-                label = langGame["assigningPhase"]["buttons"]["ready"]
-                customId = "confirm" if not player.ready else "cancel" 
-
-                readyButton = ui.Button(style=style, label=label, custom_id=f"{customId}")
-                async def ready_callback(interaction:discord.Interaction):
-                    if (interaction.user.voice is None): await error.noVoice(interaction, self.languageCode); return
-                    if (interaction.user.voice.channel.id not in GAMES): await error.noGame(interaction, self.languageCode); return
-                    if (interaction.user.voice.channel.id != self.id): await error.wrongVoice(interaction, self.languageCode); return
-
-                    await interaction.response.defer()
-
-                    ready = interaction.data["custom_id"] == "confirm"
-
-                    self.setReady(userId, ready)
-
-                    if self.readyCount == self.playerCount and self.readyCountdown is None:
-                        task = asyncio.create_task(self.startReadyCountdown(config.Game.readyCountdown))
-                        task.set_name(str(int(datetime.datetime.now().timestamp()) + config.Game.readyCountdown))
-                        if self.readyCountdown is None: self.readyCountdown = task
-                        self.updateGameMessage()
-                    else:
-                        if self.readyCountdown is not None: self.readyCountdown.cancel()
-                        self.readyCountdown = None
-
-                    self.updateGameMessage()
-                readyButton.callback = ready_callback
-                view.add_item(readyButton)
-
-                changeButton = ui.Button(style=discord.ButtonStyle.blurple, label=langGame["assigningPhase"]["buttons"]["change"], custom_id="change")
-                async def change_callback(interaction:discord.Interaction):
-                    if (interaction.user.voice is None): await error.noVoice(interaction, self.languageCode); return
-                    if (interaction.user.voice.channel.id not in GAMES): await error.noGame(interaction, self.languageCode); return
-                    if (interaction.user.voice.channel.id != self.id): await error.wrongVoice(interaction, self.languageCode); return
-
-                    await interaction.response.send_modal(modal.AssignmentModal(self, userId, self.players[userId].targetId))
-
-                changeButton.callback = change_callback
-                if player.ready: changeButton.disabled = True
-                view.add_item(changeButton)
-
-                quitButton = ui.Button(style=discord.ButtonStyle.green if player.wantsToQuit else discord.ButtonStyle.red, label=f"{langGame['assigningPhase']['buttons']['quit']} ({self.quitCount}/{self.neededToQuit})", custom_id="quit")
-                async def quit_callback(interaction:discord.Interaction):
-                    if (interaction.user.voice is None): await error.noVoice(interaction, self.languageCode); return
-                    if (interaction.user.voice.channel.id not in GAMES): await error.noGame(interaction, self.languageCode); return
-                    if (interaction.user.voice.channel.id != self.id): await error.wrongVoice(interaction, self.languageCode); return
-
-                    await interaction.response.defer()
-
-                    wantsToQuit = not self.players[userId].wantsToQuit
-                    self.setQuit(userId, wantsToQuit)
-
-                    if self.quitCount >= self.neededToQuit:
-                        await self.cancel("voteQuit")
-                    else: self.updateGameMessage()
-                
-                quitButton.callback = quit_callback
-                view.add_item(quitButton)
+                customId = "confirm" if not player.ready else "cancel"
+
+                view.add_item(ui.Button(style=style, label=langGame["assigningPhase"]["buttons"]["ready"], custom_id=f"{customId}-{self.id}"))
+                view.add_item(ui.Button(style=discord.ButtonStyle.blurple, label=langGame["assigningPhase"]["buttons"]["change"], custom_id=f"change-{self.id}", disabled=player.ready))
+                view.add_item(ui.Button(style=discord.ButtonStyle.green if player.wantsToQuit else discord.ButtonStyle.red, label=f"{langGame['assigningPhase']['buttons']['quit']} ({self.quitCount}/{self.neededToQuit})", custom_id=f"quit-{self.id}"))
             case "round":
-                langGame = language.getModule("game", self.languageCode)
-                
-                noteButton = ui.Button(style=discord.ButtonStyle.blurple, label=langGame["roundPhase"]["buttons"]["note"], custom_id="note")
-                async def note_callback(interaction:discord.Interaction):
-                    if (interaction.user.voice is None): await error.noVoice(interaction, self.languageCode); return
-                    if (interaction.user.voice.channel.id not in GAMES): await error.noGame(interaction, self.languageCode); return
-                    if (interaction.user.voice.channel.id != self.id): await error.wrongVoice(interaction, self.languageCode); return
-
-                    await interaction.response.send_modal(modal.NoteModal(self, userId))
-                
-                noteButton.callback = note_callback
-                view.add_item(noteButton)
-                if userId != self.roundOrder[self.roundIndex]: noteButton.disabled = True
-
-                guessButton = ui.Button(style=discord.ButtonStyle.blurple, label=langGame["roundPhase"]["buttons"]["guess"], custom_id="guess")
+                view.add_item(ui.Button(style=discord.ButtonStyle.blurple, label=langGame["roundPhase"]["buttons"]["note"], custom_id=f"note-{self.id}", disabled=not isCurrent))
+                view.add_item(ui.Button(style=discord.ButtonStyle.green, label=langGame["roundPhase"]["buttons"]["guess"], custom_id=f"guess-{self.id}", disabled=not isCurrent))
 
+        self.views[key] = view
         return view
 
+    @metrics.instrument("gameReady")
+    async def gameReady_callback(self, interaction:discord.Interaction):
+        if not await guards.check(interaction, self, guards.isPlayer, guards.inVoice): return
+        if self.gamePhase != "assigning": await interaction.response.defer(); return
+
+        await interaction.response.defer()
+
+        ready = interaction.data["custom_id"].startswith("confirm")
+        if ready == self.players[interaction.user.id].ready: return
+
+        self.setReady(interaction.user.id, ready)
+
+        if self.readyCount == self.playerCount and self.readyCountdown is None:
+            task = asyncio.create_task(self.startReadyCountdown(config.Game.readyCountdown))
+            task.set_name(str(int(datetime.datetime.now().timestamp() + config.Game.readyCountdown)))
+            if self.readyCountdown is None: self.readyCountdown = task
+        else:
+            if self.readyCountdown is not None: self.readyCountdown.cancel()
+            self.readyCountdown = None
+
+        self.touch()
+        self.updateGameMessage()
+
+    @metrics.instrument("change")
+    async def change_callback(self, interaction:discord.Interaction):
+        if not await guards.check(interaction, self, guards.isPlayer, guards.inVoice): return
+
+        await interaction.response.send_modal(modal.AssignmentModal(self, interaction.user.id, self.players[interaction.user.id].targetId))
+
+    @metrics.instrument("quit")
+    async def quit_callback(self, interaction:discord.Interaction):
+        if not await guards.check(interaction, self, guards.isPlayer, guards.inVoice): return
+
+        await interaction.response.defer()
+
+        wantsToQuit = not self.players[interaction.user.id].wantsToQuit
+        self.setQuit(interaction.user.id, wantsToQuit)
+
+        if self.quitCount >= self.neededToQuit:
+            await self.cancel("voteQuit")
+        else: self.updateGameMessage()
+
+    @metrics.instrument("note")
+    async def note_callback(self, interaction:discord.Interaction):
+        if not await guards.check(interaction, self, guards.isPlayer, guards.inVoice): return
+        if self.gamePhase != "round" or interaction.user.id != self.roundOrder[self.roundIndex]: await interaction.response.defer(); return
+
+        await interaction.response.send_modal(modal.NoteModal(self, interaction.user.id))
+
+    @metrics.instrument("guess")
+    async def guess_callback(self, interaction:discord.Interaction):
+        if not await guards.check(interaction, self, guards.isPlayer, guards.inVoice): return
+        if self.gamePhase != "round" or interaction.user.id != self.roundOrder[self.roundIndex]: await interaction.response.defer(); return
+
+        await interaction.response.send_modal(modal.GuessModal(self, interaction.user.id))
+
+    def guess(self, playerId:int, text:str) -> bool:
+        player = self.players[playerId]
+        player.guesses += 1
+        matcher = player.getMatcher(self.languageCode)
+        correct = matcher is not None and matcher.matches(text)
+        self.record(gamelog.GUESS, playerId, text, correct)
+        if correct:
+            player.guessed = True
+            self.winnerCount += 1
+            self.updateChannelStatus()
+        self.touch()
+        return correct
+
+    def endReason(self) -> str:
+        if self.settings["maxGuesses"] and self.winnerCount >= self.settings["maxGuesses"]: return "winnerLimit"
+        if self.winnerCount >= self.playerCount: return "allGuessed"
+        return None
+
     async def startReadyCountdown(self, seconds:int):
         await asyncio.sleep(seconds)
+        await self.actor.call(self.readyCountdownExpired)
+
+    def readyCountdownExpired(self):
+        # a countdown cancelled while its command waited in the mailbox never gets here, this covers the rest
+        if self.lobbyStatus != "playing" or self.gamePhase != "assigning" or self.readyCount != self.playerCount: return
         self.startGame()
 
+    def roundExpired(self):
+        if self.lobbyStatus != "playing" or self.gamePhase != "round" or self.roundDeadline is None: return
+        if self.roundDeadline > datetime.datetime.now(): timeouts.ROUNDS.schedule(self.id, self.roundDeadline); return
+        self.nextRound()
+
     def updateGameMessage(self, userId:int = None):
-        if userId is not None:
-            player = self.players[userId]
-            if player.gameMsg is not None:
-                asyncio.create_task(player.gameMsg.edit(embed=self.gameEmbed(userId), view=self.gameView(userId)))
-        else:
-            for player in self.players.values():
-                if player.gameMsg is not None:
-                    asyncio.create_task(player.gameMsg.edit(embed=self.gameEmbed(player.id), view=self.gameView(player.id)))
+        self.renderer.request(userId)
 
     def cancelledEmbed(self, reason:str) -> discord.Embed:
         lang = language.getModule("postgame", self.languageCode)
-        embed = self.lobbyEmbed()
-        embed.color = discord.Color.red()
+        embed = self.lobbyEmbed().copy()
+        embed.color = discord.Color.green() if reason in ("winnerLimit", "allGuessed") else discord.Color.red()
         embed.add_field(name=lang["cancelField"], value=lang["cancelReasons"][reason], inline=False)
+        winners = [f"<@{player.id}> - {player.identity}" for player in self.players.values() if player.guessed]
+        if winners: embed.add_field(name=lang["winnersField"], value="\n".join(winners), inline=False)
         return embed
+
+async def expireRound(gameId:int):
+    game = GAMES.get(gameId)
+    if game is not None: await game.actor.call(game.roundExpired)
+
+def restore(client:discord.Client, snapshots:list[dict]) -> int:
+    restored = 0
+    for data in snapshots:
+        # games past a lowered limit are not restored, their snapshots are dropped like those of ended games
+        if GAMES.full: log.warning("game not restored, registry is full", gameId=data["id"]); persistence.STORE.discard(data["id"]); continue
+        game = Game.fromSnapshot(client, data)
+        GAMES.add(game)
+        gamelog.RECORDER.snapshot(game, gamelog.RESTORED)
+        restored += 1
+    return restored
@@ -0,0 +1,132 @@
+import hashlib
+import json
+import os
+import struct
+import time
+import config
+import writebehind
+
+# every state change of a game is one record appended to a binary file, replay.py rebuilds games from it
+# record: kind u8, game id u64, milliseconds since the game was created or restored u32, then the kind's fields
+# fields: q signed 64 bit number, ? bool, s utf-8 string behind a u16 length (0xFFFF for None)
+MAGIC:bytes = b"DGL1"
+HEADER = struct.Struct("<BQI")
+NUMBER = struct.Struct("<q")
+LENGTH = struct.Struct("<H")
+NONE:int = 0xFFFF
+
+CREATED, RESTORED, JOINED, LEFT, READY, QUIT_VOTE, LANGUAGE, SETTINGS, STARTED, IDENTITY, ROUND_STARTED, NEXT_ROUND, NOTE, GUESS, ENDED = range(1, 16)
+KINDS:dict[int, tuple[str, str]] = {
+    CREATED: ("created", "s"), # snapshot json, everything later is applied on top of it
+    RESTORED: ("restored", "s"),
+    JOINED: ("joined", "q"), # userId
+    LEFT: ("left", "q"),
+    READY: ("ready", "q?"), # userId, ready
+    QUIT_VOTE: ("quitVote", "q?"),
+    LANGUAGE: ("language", "s"),
+    SETTINGS: ("settings", "qqs"), # maxGuesses, timeLimit, category
+    STARTED: ("started", "q"), # seed the assignment was drawn from
+    IDENTITY: ("identity", "qs"), # target userId, identity
+    ROUND_STARTED: ("roundStarted", ""),
+    NEXT_ROUND: ("nextRound", ""),
+    NOTE: ("note", "qss"), # userId, question, answer
+    GUESS: ("guess", "qs?"), # userId, guess, correct
+    ENDED: ("ended", "sq"), # reason, digest of the final state
+}
+
+def encode(kind:int, gameId:int, milliseconds:int, values:tuple) -> bytes:
+    parts = [HEADER.pack(kind, gameId, min(milliseconds, 0xFFFFFFFF))]
+    for field, value in zip(KINDS[kind][1], values):
+        if field == "q": parts.append(NUMBER.pack(value))
+        elif field == "?": parts.append(b"\x01" if value else b"\x00")
+        elif value is None: parts.append(LENGTH.pack(NONE))
+        else:
+            data = value.encode("utf-8")
+            parts += [LENGTH.pack(len(data)), data]
+    return b"".join(parts)
+
+def decode(data:bytes):
+    # yields (kind, gameId, milliseconds, values), a record cut off by a crash ends the log
+    if data[:len(MAGIC)] != MAGIC: raise ValueError("not a game log")
+    offset = len(MAGIC)
+    while offset + HEADER.size <= len(data):
+        kind, gameId, milliseconds = HEADER.unpack_from(data, offset)
+        if kind not in KINDS: raise ValueError(f"unknown record kind {kind} at byte {offset}")
+        position = offset + HEADER.size
+        values = []
+        try:
+            for field in KINDS[kind][1]:
+                if field == "q": values.append(NUMBER.unpack_from(data, position)[0]); position += NUMBER.size
+                elif field == "?": values.append(data[position] == 1); position += 1
+                else:
+                    length = LENGTH.unpack_from(data, position)[0]; position += LENGTH.size
+                    if length == NONE: values.append(None); continue
+                    if position + length > len(data): return
+                    values.append(data[position:position + length].decode("utf-8")); position += length
+        except (struct.error, IndexError): return
+        yield kind, gameId, milliseconds, tuple(values)
+        offset = position
+
+def read(path:str):
+    with open(path, "rb") as f:
+        data = f.read()
+    yield from decode(data)
+
+def digest(game) -> int:
+    # the state a replay has to reproduce, wall clock fields like timeouts and deadlines are left out
+    state = [game.languageCode, game.settings, game.lobbyStatus, game.gamePhase, game.roundIndex, game.roundOrder, game.roundNumber,
+             [game.playerCount, game.readyCount, game.winnerCount, game.quitCount, game.neededToQuit], [player.snapshot() for player in game.players.values()]]
+    return int.from_bytes(hashlib.blake2b(json.dumps(state, ensure_ascii=False).encode("utf-8"), digest_size=8).digest(), "little", signed=True)
+
+class GameLog(writebehind.WriteBehind):
+    file:object
+    pending:bytearray
+    origins:dict[int, float] # game id -> monotonic time of its created or restored record
+    records:int
+    written:int
+
+    def __init__(self):
+        super().__init__("gamelog")
+        self.file = None
+        self.pending = bytearray()
+        self.origins = {}
+        self.records = 0
+        self.written = 0
+
+    def connect(self):
+        self.file = open(self.path, "ab")
+        if self.file.tell() == 0: self.file.write(MAGIC); self.file.flush()
+
+    def disconnect(self):
+        self.file.close()
+
+    def interval(self) -> float:
+        return config.GameLog.flushInterval
+
+    def record(self, gameId:int, kind:int, *values):
+        if not self.enabled: return
+        now = time.monotonic()
+        if kind in (CREATED, RESTORED): self.origins[gameId] = now
+        self.pending += encode(kind, gameId, int((now - self.origins.get(gameId, now)) * 1000), values)
+        self.records += 1
+        if kind == ENDED: self.origins.pop(gameId, None)
+
+        if len(self.pending) >= config.GameLog.bufferSize: self.flushNow()
+        else: self.schedule()
+
+    def snapshot(self, game, kind:int):
+        if self.enabled: self.record(game.id, kind, json.dumps(game.snapshot(), ensure_ascii=False))
+
+    def takeBatch(self) -> bytes:
+        batch, self.pending = bytes(self.pending), bytearray()
+        return batch
+
+    def write(self, batch:bytes):
+        self.file.write(batch)
+        self.file.flush()
+        self.written += len(batch)
+
+    def size(self) -> int:
+        return os.path.getsize(self.path) if self.enabled and os.path.exists(self.path) else 0
+
+RECORDER = GameLog()
@@ -0,0 +1,51 @@
+import discord
+import error
+from registry import GAMES
+
+# every check is a constant number of dict and attribute lookups, none of them scans GAMES or channel members
+
+async def inVoice(interaction:discord.Interaction, game) -> bool:
+    if (interaction.user.voice is None): await error.noVoice(interaction, game.languageCode); return False
+    if (interaction.user.voice.channel.id not in GAMES): await error.noGame(interaction, game.languageCode); return False
+    if (interaction.user.voice.channel.id != game.id): await error.wrongVoice(interaction, game.languageCode); return False
+    return True
+
+async def isHost(interaction:discord.Interaction, game) -> bool:
+    if (interaction.user.id != game.hostId): await error.notHost(interaction, game.languageCode); return False
+    return True
+
+async def isPlayer(interaction:discord.Interaction, game) -> bool:
+    if (not game.isPlayer(interaction.user.id)): await error.notInGame(interaction, game.languageCode); return False
+    return True
+
+async def inLobby(interaction:discord.Interaction, game) -> bool:
+    # a lobby click queued behind the start of the game finds it already playing, it is acknowledged and dropped
+    if (game.lobbyStatus != "waiting"): await interaction.response.defer(); return False
+    return True
+
+async def notInOtherGame(interaction:discord.Interaction, game) -> bool:
+    other = GAMES.gameOf(interaction.user.id)
+    if other is not None and other is not game: await error.inOtherGame(interaction, game.languageCode); return False
+    return True
+
+async def check(interaction:discord.Interaction, game, *guards) -> bool:
+    for guard in guards:
+        if not await guard(interaction, game): return False
+    return True
+
+def hostPresent(game) -> bool:
+    host = game.guild.get_member(game.hostId) if game.guild is not None else None
+    return host is not None and host.voice is not None and host.voice.channel is not None and host.voice.channel.id == game.id
+
+async def canHost(interaction:discord.Interaction, languageCode:str) -> bool:
+    if (interaction.user.voice is None): await error.noVoice(interaction, languageCode); return False
+
+    existing = GAMES.get(interaction.user.voice.channel.id)
+    if existing is not None and (existing.lobbyStatus == "playing" or hostPresent(existing)):
+        await error.gameOngoing(interaction, languageCode); return False
+
+    other = GAMES.gameOf(interaction.user.id)
+    if other is not None and other is not existing: await error.inOtherGame(interaction, languageCode); return False
+
+    if existing is None and GAMES.full: await error.tooManyGames(interaction, languageCode); return False
+    return True
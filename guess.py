@@ -0,0 +1,69 @@
+import re
+import unicodedata
+import config
+
+ARTICLES:dict[str, frozenset[str]] = {
+    "en": frozenset({"the", "a", "an"}),
+    "pl": frozenset(),
+}
+# letters NFKD leaves alone because they are not built from a base letter and a combining mark
+FOLD:dict[int, str] = str.maketrans({"ł": "l", "ß": "ss", "ø": "o", "æ": "ae", "œ": "oe", "đ": "d"})
+NON_WORD = re.compile(r"[\W_]+")
+
+def fold(text:str) -> str:
+    text = unicodedata.normalize("NFKD", text.casefold().translate(FOLD))
+    return "".join(c for c in text if not unicodedata.combining(c))
+
+def normalize(text:str, languageCode:str) -> str:
+    text = fold(text)
+    articles = ARTICLES.get(languageCode, frozenset())
+    return " ".join(word for word in NON_WORD.sub(" ", text).split() if word not in articles)
+
+def distance(peq:dict[str, int], length:int, text:str) -> int:
+    # Myers' bit-parallel Levenshtein distance, one pass of integer ops per character of text
+    if length == 0: return len(text)
+    mask = (1 << length) - 1
+    high = 1 << (length - 1)
+    pv, mv, score = mask, 0, length
+    for c in text:
+        eq = peq.get(c, 0)
+        xv = eq | mv
+        xh = (((eq & pv) + pv) ^ pv) | eq
+        ph = mv | (~(xh | pv) & mask)
+        mh = pv & xh
+        if ph & high: score += 1
+        elif mh & high: score -= 1
+        ph = ((ph << 1) | 1) & mask
+        mh = (mh << 1) & mask
+        pv = mh | (~(xv | ph) & mask)
+        mv = ph & xv
+    return score
+
+class Matcher:
+    normalized:str
+    peq:dict[str, int]
+    threshold:int
+    languageCode:str
+    literal:bool # the identity is only punctuation, emoji or articles, guesses are compared to its folded text instead
+
+    def __init__(self, identity:str, languageCode:str):
+        self.languageCode = languageCode
+        self.normalized = normalize(identity, languageCode)
+        # an empty pattern would match every guess that normalizes to nothing as well
+        self.literal = self.normalized == ""
+        if self.literal: self.normalized = " ".join(fold(identity).split())
+        self.peq = {}
+        for i, c in enumerate(self.normalized): self.peq[c] = self.peq.get(c, 0) | (1 << i)
+        self.threshold = min(config.Guess.maxDistance, int(len(self.normalized) * config.Guess.maxDistanceRatio))
+
+    def prepare(self, guess:str) -> str:
+        return " ".join(fold(guess).split()) if self.literal else normalize(guess, self.languageCode)
+
+    def distance(self, guess:str) -> int:
+        return distance(self.peq, len(self.normalized), self.prepare(guess))
+
+    def matches(self, guess:str) -> bool:
+        guess = self.prepare(guess)
+        if guess == "" or self.normalized == "": return False
+        if abs(len(guess) - len(self.normalized)) > self.threshold: return False
+        return distance(self.peq, len(self.normalized), guess) <= self.threshold
@@ -0,0 +1,88 @@
+import asyncio
+import sqlite3
+import config
+import writebehind
+
+# games and participants are only ever appended, the stats table is the per guild aggregate of them
+# kept up to date in the same transaction so leaderboards never scan the history
+SCHEMA:tuple[str, ...] = (
+    "CREATE TABLE IF NOT EXISTS games (id INTEGER PRIMARY KEY, gameId INTEGER NOT NULL, guildId INTEGER NOT NULL, gamemode TEXT NOT NULL, languageCode TEXT NOT NULL, reason TEXT NOT NULL, startedAt REAL NOT NULL, duration REAL NOT NULL, players INTEGER NOT NULL, winners INTEGER NOT NULL)",
+    "CREATE TABLE IF NOT EXISTS participants (gameRowId INTEGER NOT NULL REFERENCES games (id), userId INTEGER NOT NULL, identity TEXT, notes INTEGER NOT NULL, guesses INTEGER NOT NULL, guessed INTEGER NOT NULL)",
+    "CREATE TABLE IF NOT EXISTS stats (guildId INTEGER NOT NULL, userId INTEGER NOT NULL, games INTEGER NOT NULL, wins INTEGER NOT NULL, guesses INTEGER NOT NULL, notes INTEGER NOT NULL, playtime REAL NOT NULL, PRIMARY KEY (guildId, userId)) WITHOUT ROWID",
+    "CREATE INDEX IF NOT EXISTS gamesByGuild ON games (guildId, startedAt)",
+    "CREATE INDEX IF NOT EXISTS participantsByUser ON participants (userId)",
+    "CREATE INDEX IF NOT EXISTS statsByWins ON stats (guildId, wins DESC, games)",
+    "CREATE INDEX IF NOT EXISTS statsByUser ON stats (userId)",
+)
+
+def record(game, reason:str, endedAt:float) -> tuple:
+    # built on the event loop from the finished game, only plain values cross to the writer thread
+    duration = endedAt - game.startedAt
+    participants = [(player.id, player.identity, len(player.notes), player.guesses, int(player.guessed)) for player in game.players.values()]
+    return (game.id, game.guildId, game.gamemode, game.languageCode, reason, game.startedAt, duration, game.playerCount, game.winnerCount), participants
+
+class HistoryStore(writebehind.WriteBehind):
+    connection:sqlite3.Connection
+    pending:list[tuple]
+    batches:int
+    writes:int
+
+    def __init__(self):
+        super().__init__("history")
+        self.connection = None
+        self.pending = []
+        self.batches = 0
+        self.writes = 0
+
+    def connect(self):
+        self.connection = sqlite3.connect(self.path, check_same_thread=False)
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.execute("PRAGMA synchronous=NORMAL")
+        for statement in SCHEMA: self.connection.execute(statement)
+        self.connection.commit()
+
+    def disconnect(self):
+        self.connection.close()
+
+    def interval(self) -> float:
+        return config.History.flushInterval
+
+    def append(self, game, reason:str, endedAt:float):
+        if not self.enabled: return
+        self.pending.append(record(game, reason, endedAt))
+        if len(self.pending) >= config.History.batchSize: self.flushNow()
+        else: self.schedule()
+
+    def takeBatch(self) -> list[tuple]:
+        batch, self.pending = self.pending, []
+        return batch
+
+    def write(self, batch:list[tuple]):
+        with self.connection:
+            for row, participants in batch:
+                gameRowId = self.connection.execute("INSERT INTO games (gameId, guildId, gamemode, languageCode, reason, startedAt, duration, players, winners) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)", row).lastrowid
+                guildId, duration = row[1], row[6]
+                self.connection.executemany("INSERT INTO participants (gameRowId, userId, identity, notes, guesses, guessed) VALUES (?, ?, ?, ?, ?, ?)", [(gameRowId, *participant) for participant in participants])
+                self.connection.executemany(
+                    "INSERT INTO stats (guildId, userId, games, wins, guesses, notes, playtime) VALUES (?, ?, 1, ?, ?, ?, ?) "
+                    "ON CONFLICT (guildId, userId) DO UPDATE SET games = games + 1, wins = wins + excluded.wins, guesses = guesses + excluded.guesses, notes = notes + excluded.notes, playtime = playtime + excluded.playtime",
+                    [(guildId, userId, guessed, guesses, notes, duration) for userId, _, notes, guesses, guessed in participants])
+        self.batches += 1
+        self.writes += len(batch)
+
+    def readUser(self, guildId:int, userId:int) -> dict|None:
+        row = self.connection.execute("SELECT games, wins, guesses, notes, playtime FROM stats WHERE guildId = ? AND userId = ?", (guildId, userId)).fetchone()
+        if row is None: return None
+        rank = self.connection.execute("SELECT COUNT(*) FROM stats WHERE guildId = ? AND wins > ?", (guildId, row[1])).fetchone()[0] + 1
+        return {"games": row[0], "wins": row[1], "guesses": row[2], "notes": row[3], "playtime": row[4], "rank": rank}
+
+    def readLeaderboard(self, guildId:int, limit:int) -> list[tuple[int, int, int]]:
+        return self.connection.execute("SELECT userId, wins, games FROM stats WHERE guildId = ? ORDER BY wins DESC, games LIMIT ?", (guildId, limit)).fetchall()
+
+    async def user(self, guildId:int, userId:int) -> dict|None:
+        return await asyncio.get_running_loop().run_in_executor(self.executor, self.readUser, guildId, userId)
+
+    async def leaderboard(self, guildId:int, limit:int) -> list[tuple[int, int, int]]:
+        return await asyncio.get_running_loop().run_in_executor(self.executor, self.readLeaderboard, guildId, limit)
+
+STORE = HistoryStore()
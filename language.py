@@ -1,20 +1,163 @@
+import hashlib
 import json
+import marshal
 import os
+import string
+import threading
+from types import MappingProxyType
+import config
 
-def listModules(languageCode:str) -> list:
-    if not os.path.exists(os.path.join("languages", languageCode)): return []
-    return [f[:-5] for f in os.listdir(os.path.join("languages", languageCode)) if f.endswith(".json")]
+ROOT:str = "languages"
+BUNDLE:str = "languages.bundle"
+BUNDLE_VERSION:int = 1
+FORMATTER = string.Formatter()
+
+def freeze(data):
+    if isinstance(data, dict): return MappingProxyType({key: freeze(value) for key, value in data.items()})
+    if isinstance(data, list): return tuple(freeze(value) for value in data)
+    return data
 
-def getModule(moduleName:str, languageCode:str) -> dict:
-    path = os.path.join("languages", languageCode, f"{moduleName}.json")
+def readJson(path:str):
     if not os.path.exists(path): return None
     with open(path, 'r', encoding="utf-8") as f:
         data = json.load(f)
     return data
 
-def getCodes() -> dict:
-    path = os.path.join("languages", "codes.json")
-    if not os.path.exists(path): return None
-    with open (path, 'r', encoding="utf-8") as f:
-        data = json.load(f)
-    return data
\ No newline at end of file
+def flatten(data, prefix:str = "") -> dict[str, object]:
+    # {"a": {"b": ["x"]}} -> {"a.b.0": "x"}
+    if isinstance(data, dict): items = data.items()
+    elif isinstance(data, list): items = enumerate(data)
+    else: return {prefix: data}
+    flat = {}
+    for key, value in items: flat.update(flatten(value, f"{prefix}.{key}" if prefix else str(key)))
+    return flat
+
+def placeholders(text) -> tuple[str, ...]:
+    # "{}" fields show up as empty names, so both their count and the named ones are compared
+    if not isinstance(text, str): return ()
+    return tuple(sorted(field for _, field, _, _ in FORMATTER.parse(text) if field is not None))
+
+def sourceFingerprint(root:str) -> str:
+    entries = []
+    for path, directories, files in os.walk(root):
+        directories.sort()
+        for name in sorted(files):
+            if not name.endswith(".json"): continue
+            stat = os.stat(os.path.join(path, name))
+            entries.append(f"{os.path.join(path, name)}:{stat.st_mtime_ns}:{stat.st_size}")
+    return hashlib.sha256("\n".join(entries).encode("utf-8")).hexdigest()
+
+def readSources(root:str) -> tuple[dict, dict]:
+    codes = readJson(os.path.join(root, "codes.json")) or {}
+    modules = {}
+    for languageCode in sorted(os.listdir(root)):
+        path = os.path.join(root, languageCode)
+        if not os.path.isdir(path): continue
+        modules[languageCode] = {f[:-5]: readJson(os.path.join(path, f)) for f in sorted(os.listdir(path)) if f.endswith(".json")}
+    return codes, modules
+
+def validate(codes:dict, modules:dict, reference:str) -> list[str]:
+    # every language must have the keys of the reference language and the same placeholders in each string
+    if reference not in modules: return [f"{reference}: reference language is missing"]
+    problems = [f"codes.json: {languageCode} has no language pack" for languageCode in codes if languageCode not in modules]
+    expected = {moduleName: flatten(module) for moduleName, module in modules[reference].items()}
+
+    for languageCode, languageModules in modules.items():
+        if languageCode not in codes: problems.append(f"codes.json: {languageCode} is missing")
+        elif set(codes[languageCode]) != set(modules): problems.append(f"codes.json: {languageCode} names {sorted(codes[languageCode])}, expected {sorted(modules)}")
+        if languageCode == reference: continue
+
+        for moduleName in sorted(expected.keys() | languageModules.keys()):
+            if moduleName not in languageModules: problems.append(f"{languageCode}/{moduleName}.json: missing"); continue
+            if moduleName not in expected: problems.append(f"{languageCode}/{moduleName}.json: not in {reference}"); continue
+            flat = flatten(languageModules[moduleName])
+            problems += [f"{languageCode}/{moduleName}.json: missing {key}" for key in sorted(expected[moduleName].keys() - flat.keys())]
+            problems += [f"{languageCode}/{moduleName}.json: unexpected {key}" for key in sorted(flat.keys() - expected[moduleName].keys())]
+            for key in sorted(expected[moduleName].keys() & flat.keys()):
+                if placeholders(flat[key]) != placeholders(expected[moduleName][key]):
+                    problems.append(f"{languageCode}/{moduleName}.json: {key} has placeholders {list(placeholders(flat[key]))}, {reference} has {list(placeholders(expected[moduleName][key]))}")
+    return problems
+
+def build(root:str = ROOT, bundle:str = BUNDLE) -> dict:
+    source = sourceFingerprint(root)
+    codes, modules = readSources(root)
+    problems = validate(codes, modules, config.Language.defaultCode)
+    if problems: raise ValueError("invalid language packs:\n" + "\n".join(problems))
+
+    flat = {languageCode: {f"{moduleName}.{key}": value for moduleName, module in languageModules.items() for key, value in flatten(module).items()} for languageCode, languageModules in modules.items()}
+    data = {"version": BUNDLE_VERSION, "source": source, "codes": codes, "modules": modules, "flat": flat}
+    # sharded workers can build at the same time, each writes its own file and the last replace wins
+    temporary = f"{bundle}.{os.getpid()}.tmp"
+    try:
+        with open(temporary, "wb") as f:
+            f.write(marshal.dumps(data))
+        os.replace(temporary, bundle)
+    except BaseException:
+        if os.path.exists(temporary): os.remove(temporary)
+        raise
+    return data
+
+def readBundle(root:str = ROOT, bundle:str = BUNDLE) -> dict:
+    # the bundle is rebuilt, and so validated again, whenever a json file under root changed since it was written
+    if os.path.exists(bundle):
+        with open(bundle, "rb") as f:
+            raw = f.read()
+        try: data = marshal.loads(raw)
+        except (EOFError, ValueError, TypeError): data = None
+        if isinstance(data, dict) and data.get("version") == BUNDLE_VERSION and data.get("source") == sourceFingerprint(root): return data
+    return build(root, bundle)
+
+class Catalog:
+    codes:MappingProxyType
+    modules:MappingProxyType # languageCode -> moduleName -> module
+    flat:MappingProxyType # languageCode -> "module.key.path" -> value
+
+    def __init__(self, root:str = ROOT, bundle:str = BUNDLE):
+        data = readBundle(root, bundle)
+        self.codes = freeze(data["codes"])
+        self.modules = MappingProxyType({languageCode: MappingProxyType({moduleName: freeze(module) for moduleName, module in languageModules.items()}) for languageCode, languageModules in data["modules"].items()})
+        self.flat = MappingProxyType({languageCode: MappingProxyType(flat) for languageCode, flat in data["flat"].items()})
+
+_catalog:Catalog = None
+_generation:int = 0
+_lock = threading.Lock()
+
+def load(root:str = ROOT) -> Catalog:
+    with _lock:
+        if _catalog is None: _swap(Catalog(root))
+    return _catalog
+
+def reload(root:str = ROOT) -> Catalog:
+    # the new catalog is built completely before it replaces the old one, readers never see a partial state
+    # an invalid pack raises here and the old catalog stays in place
+    catalog = Catalog(root)
+    with _lock: _swap(catalog)
+    return catalog
+
+def _swap(catalog:Catalog):
+    global _catalog, _generation
+    _catalog = catalog
+    _generation += 1
+
+def generation() -> int:
+    return _generation
+
+def catalog() -> Catalog:
+    return _catalog if _catalog is not None else load()
+
+def listModules(languageCode:str) -> list:
+    return list(catalog().modules.get(languageCode, {}).keys())
+
+def getModule(moduleName:str, languageCode:str) -> MappingProxyType:
+    return catalog().modules.get(languageCode, {}).get(moduleName)
+
+def text(key:str, languageCode:str):
+    # flat lookup, text("game.assigningPhase.modal.title", "pl") instead of walking the nested modules
+    return catalog().flat[languageCode][key]
+
+def getCodes() -> MappingProxyType:
+    return catalog().codes
+
+if __name__ == "__main__":
+    data = build()
+    print(f"Built {BUNDLE} with {len(data['modules'])} languages and {sum(len(flat) for flat in data['flat'].values())} strings.")
@@ -0,0 +1,32 @@
+import os
+import sys
+import time
+import subprocess
+import sharding
+import config
+
+# runs config.Sharding.processes copies of main.py, each owning a contiguous range of shards
+if __name__ != "__main__": exit()
+
+shardCount = int(sys.argv[1]) if len(sys.argv) > 1 else config.Sharding.shardCount
+processes = int(sys.argv[2]) if len(sys.argv) > 2 else config.Sharding.processes
+
+workers:dict[range, subprocess.Popen] = {}
+
+def spawn(shards:range) -> subprocess.Popen:
+    print(f"Starting worker for shards {shards.start}-{shards.stop - 1} of {shardCount}.")
+    return subprocess.Popen([sys.executable, "main.py"], env={**os.environ, **sharding.environment(shards, shardCount)})
+
+for shards in sharding.partition(shardCount, processes):
+    workers[shards] = spawn(shards)
+
+try:
+    while True:
+        time.sleep(config.Sharding.supervisorInterval)
+        for shards, worker in workers.items():
+            if worker.poll() is None: continue
+            print(f"Worker for shards {shards.start}-{shards.stop - 1} exited with {worker.returncode}, restarting.")
+            workers[shards] = spawn(shards)
+except KeyboardInterrupt:
+    for worker in workers.values(): worker.terminate()
+    for worker in workers.values(): worker.wait()
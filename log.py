@@ -0,0 +1,80 @@
+import json
+import logging
+import logging.handlers
+import queue
+import random
+import sys
+import config
+
+# records are handed to a bounded queue on the event loop and written by a listener thread,
+# a slow stdout then only ever blocks that thread
+LOG = logging.getLogger("dementia")
+
+class JsonFormatter(logging.Formatter):
+    def format(self, record:logging.LogRecord) -> str:
+        data = {"time": round(record.created, 3), "level": record.levelname, "logger": record.name, "message": record.getMessage()}
+        data.update(getattr(record, "fields", {}))
+        return json.dumps(data, ensure_ascii=False, default=str)
+
+class DroppingQueueHandler(logging.handlers.QueueHandler):
+    dropped:dict[str, int] # levelname -> records not written
+
+    def __init__(self, recordQueue:queue.Queue):
+        super().__init__(recordQueue)
+        self.dropped = {}
+
+    def enqueue(self, record:logging.LogRecord):
+        # below warning, records are sampled once the queue fills up and never take the room kept for warnings
+        if record.levelno < logging.WARNING:
+            depth = self.queue.qsize() / self.queue.maxsize
+            if depth >= 1 - config.Logging.reserve or (depth >= config.Logging.sampleAbove and random.random() >= config.Logging.sampleRate):
+                self.drop(record); return
+        try: self.queue.put_nowait(record)
+        except queue.Full: self.drop(record)
+
+    def drop(self, record:logging.LogRecord):
+        self.dropped[record.levelname] = self.dropped.get(record.levelname, 0) + 1
+
+class Listener(logging.handlers.QueueListener):
+    def enqueue_sentinel(self):
+        # the queue may be full at shutdown, the sentinel waits for room instead of being lost
+        self.queue.put(self._sentinel)
+
+QUEUE:queue.Queue = queue.Queue(config.Logging.queueSize)
+HANDLER = DroppingQueueHandler(QUEUE)
+listener:Listener = None
+
+def setup(stream = None):
+    global listener
+    if listener is not None: return
+    output = logging.StreamHandler(stream or sys.stdout)
+    output.setFormatter(JsonFormatter())
+    root = logging.getLogger()
+    root.setLevel(config.Logging.level)
+    root.handlers = [HANDLER]
+    listener = Listener(QUEUE, output)
+    listener.start()
+
+def stop():
+    global listener
+    if listener is None: return
+    listener.stop()
+    listener = None
+
+def droppedCount() -> int:
+    return sum(HANDLER.dropped.values())
+
+def gameFields(game) -> dict:
+    return {"gameId": game.id, "guildId": game.guildId, "phase": game.gamePhase if game.lobbyStatus == "playing" else game.lobbyStatus}
+
+def debug(message:str, **fields):
+    LOG.debug(message, extra={"fields": fields})
+
+def info(message:str, **fields):
+    LOG.info(message, extra={"fields": fields})
+
+def warning(message:str, **fields):
+    LOG.warning(message, extra={"fields": fields})
+
+def error(message:str, **fields):
+    LOG.error(message, extra={"fields": fields})
@@ -1,3 +1,4 @@
+import startup
 import discord
 import discord.ext.commands as commands
 import discord.ui as ui
@@ -5,28 +6,49 @@ from discord import app_commands
 from modal import *
 from game import *
 import error
+import dispatch
+import guards
 import language
+import timeouts
+import status
+import persistence
+import history
+import gamelog
+import sharding
+import diagnostics
+import metrics
+import outbound
+import log
+import wordbank
 import asyncio
 import datetime
 
 if __name__ != "__main__": exit()
 
+log.setup()
+
 token:str = None
 with open('TOKEN', 'r', encoding="utf-8") as file:
     token = file.read().strip()
 
-client = commands.Bot(intents=discord.Intents.all(), command_prefix="//", sync_commands=True)
+# builds and validates languages.bundle when a pack changed, a missing key or placeholder stops the bot here
+language.load()
+for languageCode in language.getCodes(): wordbank.get(languageCode)
+
+shardIds, shardCount = sharding.fromEnvironment()
+if shardIds is None: client = commands.Bot(intents=discord.Intents.all(), command_prefix="//", sync_commands=True, http_trace=outbound.attach(metrics.trace()))
+else: client = commands.AutoShardedBot(intents=discord.Intents.all(), command_prefix="//", sync_commands=True, shard_ids=shardIds, shard_count=shardCount, http_trace=outbound.attach(metrics.trace()))
+client.add_listener(dispatch.dispatch, "on_interaction")
 
 @client.event
 async def on_ready():
-    print(f'Logged in as {client.user.name}.')
-    await client.tree.sync()
+    log.info("logged in", user=client.user.name, guilds=len(client.guilds))
+    startup.mark("ready")
 
-@app_commands.describe(language_code=f"Valid codes: {' | '.join([f'{key}' for key in language.getCodes().keys()])}")
+@app_commands.describe(language_code="Language of the game.", category="Category of identities, players get suggestions from it.")
 @client.tree.command(name="host", description="Host a game.")
-async def host(interaction:discord.Interaction, language_code:str=config.Language.defaultCode):
-    print(f"host accessed by {interaction.user.name}")
-
+@metrics.instrument("host")
+async def host(interaction:discord.Interaction, language_code:str=config.Language.defaultCode, category:str=None):
     if language_code not in language.getCodes().keys():
         await interaction.response.send_message(content=f"Invalid language code. Valid codes: {' | '.join([f"{key}" for key in language.getCodes().keys()])}", ephemeral=True)
         return
@@ -42,21 +64,17 @@ async def host(interaction:discord.Interaction, language_code:str=config.Languag
     modeSelect = ui.Select(placeholder=langLobby["modeSelect"], custom_id="modeSelect")
     async def modeSelect_callback(interaction:discord.Interaction):
         if interaction.user.id != initialUserId: await error.notHost(interaction, language_code); return
-        if (interaction.user.voice is None): await error.noVoice(interaction, language_code); return
-        elif (interaction.user.voice.channel.id in GAMES):
-            if GAMES[interaction.user.voice.channel.id].lobbyStatus == "playing" or GAMES[interaction.user.voice.channel.id].hostId in [member.id for member in interaction.user.voice.channel.members]:
-                await error.gameOngoing(interaction, language_code); return
-        
+        if not await guards.canHost(interaction, language_code): return
+
         gameId:int = interaction.user.voice.channel.id
         GAMES[gameId] = Game(client, interaction.guild, hostId=interaction.user.id, id=gameId, gamemode=interaction.data["values"][0], languageCode=language_code, vc=interaction.user.voice.channel, msg=interaction.message)
+        if category: GAMES[gameId].setSettings(GAMES[gameId].settings["maxGuesses"], GAMES[gameId].settings["timeLimit"], category)
 
 
-        embed = GAMES[gameId].lobbyEmbed()
-        view = GAMES[gameId].lobbyView()
+        modeSelectView.stop()
+        await GAMES[gameId].respondLobby(interaction)
 
-        await interaction.response.edit_message(embed=embed, view=view)
-
-    modeSelect.callback = modeSelect_callback
+    modeSelect.callback = metrics.instrument("modeSelect")(modeSelect_callback)
 
     for codename in langGamemodes:
         display:str = langGamemodes[codename]["display"]
@@ -68,10 +86,77 @@ async def host(interaction:discord.Interaction, language_code:str=config.Languag
 
     await interaction.response.send_message(embed=modeSelectEmbed, view=modeSelectView)
 
+@host.autocomplete("language_code")
+async def languageCodeAutocomplete(interaction:discord.Interaction, current:str) -> list[app_commands.Choice[str]]:
+    names = language.getCodes().get(config.Language.defaultCode, {})
+    current = current.casefold()
+    return [app_commands.Choice(name=f"{code} ({names.get(code, code)})", value=code) for code in language.getCodes().keys() if code.startswith(current) or names.get(code, "").casefold().startswith(current)][:config.WordBank.autocompleteLimit]
+
+@host.autocomplete("category")
+async def hostCategoryAutocomplete(interaction:discord.Interaction, current:str) -> list[app_commands.Choice[str]]:
+    bank = wordbank.get(interaction.namespace.language_code or config.Language.defaultCode)
+    if bank is None: return []
+    return [app_commands.Choice(name=display, value=display) for display in bank.completeCategory(current, config.WordBank.autocompleteLimit)]
+
+def languageOf(interaction:discord.Interaction) -> str:
+    # the language of the game the user plays in, the default one otherwise
+    game = GAMES.gameOf(interaction.user.id)
+    return game.languageCode if game is not None else config.Language.defaultCode
+
+def wordBankFor(interaction:discord.Interaction):
+    return wordbank.get(languageOf(interaction)), GAMES.gameOf(interaction.user.id)
+
+@app_commands.describe(category="Only words from this category.", prefix="Start of the word.")
+@client.tree.command(name="words", description="Browse the word bank for identity ideas.")
+@metrics.instrument("words")
+async def words(interaction:discord.Interaction, category:str=None, prefix:str=None):
+    bank, game = wordBankFor(interaction)
+    langWordBank = language.getModule("game", languageOf(interaction))["wordBank"]
+    if bank is None: await interaction.response.send_message(langWordBank["empty"], ephemeral=True); return
+
+    categoryId = bank.resolve(category or (game.settings["category"] if game is not None else None))
+    found = bank.complete(prefix, categoryId, config.WordBank.autocompleteLimit) if prefix else bank.suggest(categoryId, config.WordBank.autocompleteLimit)
+    title = langWordBank["title"] if categoryId is None else f"{langWordBank["title"]} - {bank.categories[categoryId]["display"]}"
+    embed = discord.Embed(title=title, description="\n".join(found) if found else langWordBank["empty"], color=discord.Color.blurple())
+    await interaction.response.send_message(embed=embed, ephemeral=True)
+
+@words.autocomplete("category")
+async def wordsCategoryAutocomplete(interaction:discord.Interaction, current:str) -> list[app_commands.Choice[str]]:
+    bank, _ = wordBankFor(interaction)
+    if bank is None: return []
+    return [app_commands.Choice(name=display, value=display) for display in bank.completeCategory(current, config.WordBank.autocompleteLimit)]
+
+@words.autocomplete("prefix")
+async def wordsPrefixAutocomplete(interaction:discord.Interaction, current:str) -> list[app_commands.Choice[str]]:
+    bank, game = wordBankFor(interaction)
+    if bank is None: return []
+    categoryId = bank.resolve(interaction.namespace.category or (game.settings["category"] if game is not None else None))
+    return [app_commands.Choice(name=word, value=word) for word in bank.complete(current, categoryId, config.WordBank.autocompleteLimit)]
+
+@app_commands.describe(user="Whose stats to show, yours by default.")
+@client.tree.command(name="stats", description="Stats and leaderboard of this server.")
+@app_commands.guild_only()
+@metrics.instrument("stats")
+async def stats(interaction:discord.Interaction, user:discord.Member=None):
+    user = user or interaction.user
+    langStats = language.getModule("stats", languageOf(interaction))
+    # both answers come from the aggregate table and its indexes, the game history is never scanned
+    userStats = await history.STORE.user(interaction.guild.id, user.id)
+    leaderboard = await history.STORE.leaderboard(interaction.guild.id, config.History.leaderboardSize)
+
+    embed = discord.Embed(title=f"{langStats["title"]} - {interaction.guild.name}", color=discord.Color.blurple())
+    if userStats is None: embed.add_field(name=user.display_name, value=langStats["noGames"], inline=False)
+    else:
+        lines = [langStats[key].format(userStats[key]) for key in ("games", "wins", "guesses", "notes", "rank")]
+        lines.insert(4, langStats["playtime"].format(round(userStats["playtime"] / 60)))
+        embed.add_field(name=user.display_name, value="\n".join(lines), inline=False)
+    rows = [langStats["leaderboardRow"].format(place, userId, wins, games) for place, (userId, wins, games) in enumerate(leaderboard, 1)]
+    embed.add_field(name=langStats["leaderboard"], value="\n".join(rows) if rows else langStats["noGames"], inline=False)
+    await interaction.response.send_message(embed=embed, ephemeral=True)
+
 @client.tree.command(name="info", description="Info about the game.")
+@metrics.instrument("info")
 async def info(interaction:discord.Interaction):
-    print(f"info accessed by {interaction.user.name}")
-
     initialUserId = interaction.user.id
     langCodes = language.getCodes()
 
@@ -92,26 +177,84 @@ async def info(interaction:discord.Interaction):
             languageCode = interaction.data["values"][0]
             await interaction.response.edit_message(view=getView(languageCode), embed=getEmbed(languageCode))
 
-        languageSelect.callback = languageSelect_callback
+        languageSelect.callback = metrics.instrument("infoLanguage")(languageSelect_callback)
         view.add_item(languageSelect)
         return view
 
     await interaction.response.send_message(embed=getEmbed(config.Language.defaultCode), view=getView(config.Language.defaultCode))
 
-async def backgroundCleaner():
-    await client.wait_until_ready()
-    while not client.is_closed():
-        for gameId, game in list(GAMES.items()):
-            #print(game.timeout)
-            if game.timeout is None: continue
-            elif game.timeout.timestamp()-datetime.datetime.now().timestamp() < config.BackgroundCleaner.sleepTime:
-                await game.cancel("timeout")
-                print(f"Game {gameId} timed out.")
-        await asyncio.sleep(config.BackgroundCleaner.sleepTime)
-
-async def main():
-    asyncio.create_task(backgroundCleaner())
-    await client.start(token)
-
-client.run(token)
-#asyncio.run(main())
\ No newline at end of file
+@client.command(name="shards")
+@commands.is_owner()
+async def shards(ctx:commands.Context):
+    await ctx.reply(f"```\n{sharding.formatSummary(sharding.summary(client, GAMES))}\n```")
+
+@client.command(name="memory")
+@commands.is_owner()
+async def memory(ctx:commands.Context, mode:str = None):
+    if mode in ("trace", "stop"): diagnostics.trace(mode == "trace")
+    # walks live objects, so it runs on the event loop where nothing mutates them meanwhile
+    report = diagnostics.summary(GAMES)
+    await ctx.reply(f"```\n{diagnostics.formatSummary(report)[:1900]}\n```")
+
+@client.command(name="sync")
+@commands.is_owner()
+async def sync(ctx:commands.Context):
+    await startup.syncCommands(client.tree, client.application_id, config.Startup.fingerprintPath, force=True)
+    await ctx.reply("Synced application commands.")
+
+@client.command(name="reloadlanguages")
+@commands.is_owner()
+async def reloadLanguages(ctx:commands.Context):
+    try: catalog = language.reload()
+    except ValueError as e: await ctx.reply(f"```\n{str(e)[:1900]}\n```"); return
+    await ctx.reply(f"Reloaded {len(catalog.modules)} language packs.")
+
+async def timeoutGame(gameId:int):
+    game = GAMES.get(gameId)
+    if game is not None: await game.actor.call(lobbyTimeout, game)
+
+async def lobbyTimeout(game:Game):
+    if game.timeout is None or game.lobbyStatus == "finished": return
+    if game.timeout > datetime.datetime.now(): timeouts.SCHEDULER.schedule(game.id, game.timeout); return
+    log.info("game timed out", **log.gameFields(game))
+    await game.cancel("timeout")
+
+@client.event
+async def setup_hook():
+    startup.mark("login")
+    await persistence.STORE.open(config.Persistence.path)
+    await history.STORE.open(config.History.path)
+    await gamelog.RECORDER.open(sharding.workerPath(config.GameLog.path, shardIds))
+    log.info("games restored", count=restore(client, sharding.owned(await persistence.STORE.load(), shardIds, shardCount)))
+    timeouts.SCHEDULER.start(timeoutGame)
+    timeouts.ROUNDS.start(expireRound)
+
+    metrics.gauge("dementia_active_games", "Games in GAMES.", lambda: len(GAMES))
+    metrics.gauge("dementia_active_players", "Players across all games.", lambda: sum(game.playerCount for game in GAMES.values()))
+    metrics.gauge("dementia_pending_tasks", "Tasks alive on the event loop.", lambda: len(asyncio.all_tasks()))
+    metrics.gauge("dementia_channel_status_queue", "Voice channels waiting for a status write.", lambda: status.WRITER.queueDepth)
+    metrics.gauge("dementia_actor_queue_depth", "Commands waiting in game mailboxes.", lambda: sum(game.actor.depth for game in GAMES.values()))
+    metrics.gauge("dementia_actor_max_queue_depth", "Longest game mailbox.", lambda: max((game.actor.depth for game in GAMES.values()), default=0))
+    metrics.gauge("dementia_outbound_queue", "Scheduled REST calls waiting for their turn.", outbound.SCHEDULER.queued)
+    for priority, name in outbound.CLASSES.items():
+        metrics.gauge(f"dementia_outbound_queue_{name}", f"Scheduled {name} REST calls waiting for their turn.", lambda priority=priority: outbound.SCHEDULER.queued(priority))
+    metrics.gauge("dementia_outbound_in_flight", "Scheduled REST calls in flight.", lambda: outbound.SCHEDULER.inFlight)
+    metrics.gauge("dementia_outbound_tasks", "Tasks held by the REST scheduler.", lambda: len(outbound.SCHEDULER.tasks))
+    metrics.gauge("dementia_log_queue", "Log records waiting for the writer thread.", lambda: log.QUEUE.qsize())
+    metrics.gauge("dementia_log_dropped", "Log records sampled out or dropped because the queue was full.", log.droppedCount)
+    metrics.gauge("dementia_gamelog_records", "Game log records appended since startup.", lambda: gamelog.RECORDER.records)
+    metrics.gauge("dementia_write_failures", "Snapshot, history and game log batches lost to a failed write.", lambda: persistence.STORE.failures + history.STORE.failures + gamelog.RECORDER.failures)
+    await metrics.serve(config.Metrics.host, sharding.workerPort(config.Metrics.port, shardIds))
+
+    # with several processes only the one holding shard 0 syncs, they share the same global commands
+    if shardIds is None or 0 in shardIds:
+        synced = await startup.syncCommands(client.tree, client.application_id, config.Startup.fingerprintPath)
+        log.info("application commands synced" if synced else "application commands unchanged, sync skipped")
+    startup.mark("commands")
+
+startup.mark("import")
+client.run(token, log_handler=None)
+persistence.STORE.close()
+history.STORE.close()
+gamelog.RECORDER.close()
+log.stop()
\ No newline at end of file
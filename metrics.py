@@ -0,0 +1,159 @@
+import bisect
+import contextvars
+import functools
+import time
+import aiohttp
+import aiohttp.web
+import config
+import log
+
+LATENCY_BUCKETS:tuple[float, ...] = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2, 3, 5, 10)
+COUNT_BUCKETS:tuple[float, ...] = (0, 1, 2, 4, 8, 16, 32, 64)
+
+class Histogram:
+    buckets:tuple[float, ...]
+    counts:list[int]
+    sum:float
+    count:int
+
+    def __init__(self, buckets:tuple[float, ...]):
+        self.buckets = buckets
+        self.counts = [0] * len(buckets)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value:float):
+        index = bisect.bisect_left(self.buckets, value)
+        if index < len(self.counts): self.counts[index] += 1
+        self.sum += value
+        self.count += 1
+
+    def lines(self, name:str, labels:str) -> list[str]:
+        out, cumulative = [], 0
+        for bound, count in zip(self.buckets, self.counts):
+            cumulative += count
+            out.append(f'{name}_bucket{{{labels},le="{bound}"}} {cumulative}')
+        out.append(f'{name}_bucket{{{labels},le="+Inf"}} {self.count}')
+        out.append(f"{name}_sum{{{labels}}} {self.sum}")
+        out.append(f"{name}_count{{{labels}}} {self.count}")
+        return out
+
+class Call:
+    # one running handler, REST calls made by it or by tasks it spawns are attributed to it
+    handler:str
+    start:float
+    created:float
+    acknowledged:float
+    restCalls:int
+
+    def __init__(self, handler:str, created:float):
+        self.handler = handler
+        self.start = time.time()
+        self.created = created or self.start
+        self.acknowledged = None
+        self.restCalls = 0
+
+current:contextvars.ContextVar[Call] = contextvars.ContextVar("current", default=None)
+
+HISTOGRAMS:dict[str, tuple[str, tuple[float, ...], str]] = {
+    "dementia_handler_seconds": ("Total time spent in a callback.", LATENCY_BUCKETS, "handler"),
+    "dementia_acknowledge_seconds": ("Time from interaction creation to its acknowledgement.", LATENCY_BUCKETS, "handler"),
+    "dementia_handler_rest_calls": ("REST calls made per callback.", COUNT_BUCKETS, "handler"),
+    "dementia_teardown_seconds": ("Time to tear a game down.", LATENCY_BUCKETS, "reason"),
+    "dementia_actor_wait_seconds": ("Time a command waited in its game's mailbox.", LATENCY_BUCKETS, "command"),
+    "dementia_actor_service_seconds": ("Time a game actor spent running a command.", LATENCY_BUCKETS, "command"),
+    "dementia_outbound_wait_seconds": ("Time a scheduled REST call waited for its turn.", LATENCY_BUCKETS, "class"),
+}
+histograms:dict[tuple[str, str], Histogram] = {}
+counters:dict[tuple[str, str], int] = {}
+gauges:dict[str, tuple[str, object]] = {}
+COUNTER_LABELS:dict[str, str] = {"dementia_rest_calls_total": "route", "dementia_suppressed_edits_total": "message", "dementia_outbound_exhausted_total": "route"}  # label name, "handler" otherwise
+
+def observe(name:str, label:str, value:float):
+    key = (name, label)
+    if key not in histograms: histograms[key] = Histogram(HISTOGRAMS[name][1])
+    histograms[key].observe(value)
+
+def increment(name:str, handler:str, amount:int = 1):
+    counters[(name, handler)] = counters.get((name, handler), 0) + amount
+
+def gauge(name:str, help:str, read):
+    gauges[name] = (help, read)
+
+def recordRest(route:str):
+    increment("dementia_rest_calls_total", route)
+    call = current.get()
+    if call is None: return
+    call.restCalls += 1
+
+def acknowledge():
+    call = current.get()
+    if call is None or call.acknowledged is not None: return
+    call.acknowledged = time.time()
+    observe("dementia_acknowledge_seconds", call.handler, call.acknowledged - call.created)
+
+def instrument(handler:str):
+    def decorator(callback):
+        @functools.wraps(callback)
+        async def wrapper(*args, **kwargs):
+            interaction = kwargs.get("interaction", args[-1] if args else None)
+            createdAt = getattr(interaction, "created_at", None)
+            call = Call(handler, createdAt.timestamp() if createdAt is not None else None)
+            token = current.set(call)
+            try: return await callback(*args, **kwargs)
+            finally:
+                current.reset(token)
+                duration = time.time() - call.start
+                observe("dementia_handler_seconds", handler, duration)
+                observe("dementia_handler_rest_calls", handler, call.restCalls)
+                increment("dementia_handler_calls_total", handler)
+                if call.acknowledged is None or call.acknowledged - call.created > config.Metrics.deadline:
+                    increment("dementia_deadline_misses_total", handler)
+
+                # game callbacks are bound to a Game, modal callbacks to a modal holding one
+                game = getattr(args[0], "game", args[0]) if len(args) > 1 else None
+                fields = {"handler": handler, "userId": getattr(getattr(interaction, "user", None), "id", None), "guildId": getattr(interaction, "guild_id", None), "duration": round(duration, 4), "restCalls": call.restCalls}
+                if hasattr(game, "lobbyStatus"): fields.update(log.gameFields(game))
+                log.info("handler", **fields)
+        return wrapper
+    return decorator
+
+def trace() -> aiohttp.TraceConfig:
+    # every REST call of discord.py, interaction responses included, goes through the client's aiohttp session
+    traceConfig = aiohttp.TraceConfig()
+
+    async def onRequestEnd(session, context, params):
+        path = params.url.path
+        route = f"{params.method} {path.split('/')[3] if path.count('/') > 3 else path}"
+        recordRest(route)
+        if path.startswith("/api/") and "/interactions/" in path and path.endswith("/callback"): acknowledge()
+
+    traceConfig.on_request_end.append(onRequestEnd)
+    return traceConfig
+
+def render() -> str:
+    lines = []
+    for name, (help, _, labelName) in HISTOGRAMS.items():
+        lines += [f"# HELP {name} {help}", f"# TYPE {name} histogram"]
+        for (histogramName, label), histogram in sorted(histograms.items()):
+            if histogramName == name: lines += histogram.lines(name, f'{labelName}="{label}"')
+    for name in sorted({name for name, _ in counters}):
+        lines.append(f"# TYPE {name} counter")
+        label = COUNTER_LABELS.get(name, "handler")
+        lines += [f'{name}{{{label}="{key}"}} {value}' for (counterName, key), value in sorted(counters.items()) if counterName == name]
+    for name, (help, read) in sorted(gauges.items()):
+        lines += [f"# HELP {name} {help}", f"# TYPE {name} gauge", f"{name} {read()}"]
+    return "\n".join(lines) + "\n"
+
+async def handle(request:aiohttp.web.Request) -> aiohttp.web.Response:
+    return aiohttp.web.Response(text=render(), content_type="text/plain", charset="utf-8")
+
+async def serve(host:str, port:int) -> aiohttp.web.AppRunner:
+    app = aiohttp.web.Application()
+    app.router.add_get("/metrics", handle)
+    runner = aiohttp.web.AppRunner(app, access_log=None)
+    await runner.setup()
+    # a port already taken leaves this process without an endpoint instead of stopping it
+    try: await aiohttp.web.TCPSite(runner, host, port).start()
+    except OSError as e: log.warning("metrics endpoint not started", host=host, port=port, error=str(e)); await runner.cleanup(); return None
+    return runner
@@ -3,7 +3,10 @@ from game import Game
 import datetime
 import config
 import language
+import metrics
+import wordbank
 
+# submits run on the game's actor like the button callbacks, so they never interleave with them
 class SettingsModal(discord.ui.Modal):
     game:Game
 
@@ -20,9 +23,13 @@ class SettingsModal(discord.ui.Modal):
         self.add_item(self.maxGuesses)
         self.add_item(self.timeLimit)
 
+    @metrics.instrument("settingsModal")
     async def on_submit(self, interaction:discord.Interaction):
+        await self.game.actor.call(self.submit, interaction)
+
+    async def submit(self, interaction:discord.Interaction):
         try:
-            if datetime.datetime.now() > self.game.timeout: await interaction.response.defer(); return
+            if self.game.lobbyStatus != "waiting" or datetime.datetime.now() > self.game.timeout: await interaction.response.defer(); return
             maxGuesses = int(self.maxGuesses.value) if self.maxGuesses.value != "" else 0
             timeLimit = int(self.timeLimit.value) if self.timeLimit.value != "" else 0
             category = self.category.value
@@ -30,10 +37,8 @@ class SettingsModal(discord.ui.Modal):
             if maxGuesses < 0 or timeLimit < 0:
                 raise ValueError
 
-            self.game.settings["maxGuesses"] = maxGuesses if maxGuesses < self.game.playerCount else 0
-            self.game.settings["timeLimit"] = timeLimit
-            self.game.settings["category"] = None if category == "0" else category
-            await interaction.response.edit_message(embed=self.game.lobbyEmbed())
+            self.game.setSettings(maxGuesses if maxGuesses < self.game.playerCount else 0, timeLimit, None if category == "0" else category)
+            await self.game.respondLobby(interaction)
         except ValueError:
             await interaction.response.send_message("Invalid input.", ephemeral=True)
             return
@@ -53,23 +58,32 @@ class AssignmentModal(discord.ui.Modal):
         self.game = game
         self.playerId = playerId
         self.targetPlayerId = targetPlayerId
-        langModule = language.getModule("game", self.game.languageCode)
+        languageCode = self.game.languageCode
 
         targetPlayer = self.game.guild.get_member(self.targetPlayerId)
         placeholder = targetPlayer.name if targetPlayer.display_name == targetPlayer.name else f"{targetPlayer.display_name} ({targetPlayer.name})"
 
-        self.identity = discord.ui.TextInput(label=langModule["assigningPhase"]["modal"]["fields"]["identity"]["label"], placeholder=langModule["assigningPhase"]["modal"]["fields"]["identity"]["placeholder"].format(placeholder), required=True, max_length=config.AssignmentModal.maxChars)
+        placeholder = language.text("game.assigningPhase.modal.fields.identity.placeholder", languageCode).format(placeholder)
+        bank = wordbank.get(self.game.languageCode)
+        if bank is not None:
+            suggestions = bank.suggest(bank.resolve(self.game.settings["category"]), config.WordBank.suggestions)
+            if suggestions: placeholder = f"{placeholder} {language.text("game.assigningPhase.modal.fields.identity.suggestions", languageCode).format(", ".join(suggestions))}"
+
+        self.identity = discord.ui.TextInput(label=language.text("game.assigningPhase.modal.fields.identity.label", languageCode), placeholder=placeholder[:100], required=True, max_length=config.AssignmentModal.maxChars)
 
-        super().__init__(title=langModule["assigningPhase"]["modal"]["title"], timeout=None)
+        super().__init__(title=language.text("game.assigningPhase.modal.title", languageCode), timeout=None)
 
         self.add_item(self.identity)
 
+    @metrics.instrument("assignmentModal")
     async def on_submit(self, interaction:discord.Interaction):
-        self.game.players[self.targetPlayerId].identity = self.identity.value
+        await self.game.actor.call(self.submit, interaction)
+
+    async def submit(self, interaction:discord.Interaction):
+        self.game.assignIdentity(self.targetPlayerId, self.identity.value)
         if self.game.players[self.playerId].gameMsg is None:
-            await interaction.response.send_message(embed=self.game.gameEmbed(self.playerId), view=self.game.gameView(self.playerId), ephemeral=True)
+            await self.game.sendGameMessage(interaction, self.playerId)
             self.game.updateGameMessage()
-            self.game.players[self.playerId].gameMsg = await interaction.original_response()
         else:
             await interaction.response.defer()
             self.game.updateGameMessage()
@@ -83,32 +97,79 @@ class AssignmentModal(discord.ui.Modal):
 class NoteModal(discord.ui.Modal):
     game:Game
     playerId:int
+    roundNumber:int
 
     def __init__(self, game:Game, playerId:int):
         self.game = game
         self.playerId = playerId
-        langModule = language.getModule("game", self.game.languageCode)
+        self.roundNumber = game.roundNumber
+        languageCode = self.game.languageCode
 
         player = self.game.guild.get_member(self.playerId)
 
-        self.question = discord.ui.TextInput(label=langModule["roundPhase"]["noteModal"]["fields"]["question"]["label"], required=True, max_length=config.NoteModal.Question.maxChars)
-        self.answer = discord.ui.TextInput(label=langModule["roundPhase"]["noteModal"]["fields"]["answer"]["label"], required=True, max_length=config.NoteModal.Note.maxChars)
+        self.question = discord.ui.TextInput(label=language.text("game.roundPhase.noteModal.fields.question.label", languageCode), required=True, max_length=config.NoteModal.Question.maxChars)
+        self.answer = discord.ui.TextInput(label=language.text("game.roundPhase.noteModal.fields.answer.label", languageCode), required=True, max_length=config.NoteModal.Note.maxChars)
 
-        super().__init__(title=langModule["roundPhase"]["noteModal"]["title"].format(player.display_name), timeout=None)
+        super().__init__(title=language.text("game.roundPhase.noteModal.title", languageCode).format(player.display_name), timeout=None)
 
         self.add_item(self.question)
         self.add_item(self.answer)
 
+    @metrics.instrument("noteModal")
     async def on_submit(self, interaction:discord.Interaction):
+        await self.game.actor.call(self.submit, interaction)
+
+    async def submit(self, interaction:discord.Interaction):
         question = self.question.value
         answer = self.answer.value
-        self.game.players[self.playerId].addNote(question, answer)
+        self.game.addNote(self.playerId, question, answer)
 
         await interaction.response.defer()
+        # the round clock may have moved on while the modal was open, the note is kept but the turn is over
+        if self.game.roundNumber != self.roundNumber: self.game.touch(); self.game.updateGameMessage(self.playerId); return
         self.game.nextRound()
 
     async def on_error(self, interaction, error):
         return await super().on_error(interaction, error)
 
+    async def on_timeout(self, interaction:discord.Interaction):
+        await interaction.response.defer()
+
+class GuessModal(discord.ui.Modal):
+    game:Game
+    playerId:int
+    roundNumber:int
+
+    def __init__(self, game:Game, playerId:int):
+        self.game = game
+        self.playerId = playerId
+        self.roundNumber = game.roundNumber
+        languageCode = self.game.languageCode
+
+        self.guess = discord.ui.TextInput(label=language.text("game.roundPhase.guessModal.fields.guess.label", languageCode), required=True, max_length=config.AssignmentModal.maxChars)
+
+        super().__init__(title=language.text("game.roundPhase.guessModal.title", languageCode), timeout=None)
+
+        self.add_item(self.guess)
+
+    @metrics.instrument("guessModal")
+    async def on_submit(self, interaction:discord.Interaction):
+        await self.game.actor.call(self.submit, interaction)
+
+    async def submit(self, interaction:discord.Interaction):
+        if self.game.gamePhase != "round" or self.game.roundNumber != self.roundNumber: await interaction.response.defer(); return
+        languageCode = self.game.languageCode
+
+        correct = self.game.guess(self.playerId, self.guess.value)
+        result = language.text("game.roundPhase.guessModal.correct", languageCode).format(self.game.players[self.playerId].identity) if correct else language.text("game.roundPhase.guessModal.wrong", languageCode)
+        await interaction.response.send_message(result, ephemeral=True)
+
+        reason = self.game.endReason()
+        if reason is not None: await self.game.cancel(reason)
+        else: self.game.nextRound()
+
+    async def on_error(self, interaction, error):
+        return await super().on_error(interaction, error)
+
     async def on_timeout(self, interaction:discord.Interaction):
         await interaction.response.defer()
\ No newline at end of file
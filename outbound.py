@@ -0,0 +1,177 @@
+import asyncio
+import contextvars
+import heapq
+import itertools
+import time
+import aiohttp
+import config
+import metrics
+
+# priority classes, lower goes first
+# interaction responses are not queued at all, callbacks answer them inline within discord's deadline,
+# everything below shares config.Outbound.concurrency so the connection always has room left for them
+GAME_MESSAGE:int = 1
+LOBBY_MESSAGE:int = 2
+CHANNEL_STATUS:int = 3
+CLASSES:dict[int, str] = {GAME_MESSAGE: "gameMessage", LOBBY_MESSAGE: "lobbyMessage", CHANNEL_STATUS: "channelStatus"}
+
+# the (route, bucket) of the scheduled request a REST call belongs to, read when its rate limit headers come back
+current:contextvars.ContextVar[tuple[str, int]] = contextvars.ContextVar("outboundBucket", default=None)
+
+class Bucket:
+    # one rate limit bucket, discord keys them by route and the channel or webhook the request touches
+    limit:int
+    inFlight:int
+    remaining:int # X-RateLimit-Remaining of the last response, None until one was seen
+    resetAt:float # loop time the bucket refills
+    waiting:list[tuple] # entries parked until the bucket has budget again, a heap like the scheduler's
+
+    def __init__(self, limit:int):
+        self.limit = limit
+        self.inFlight = 0
+        self.remaining = None
+        self.resetAt = 0
+        self.waiting = []
+
+    def available(self, now:float) -> bool:
+        if self.inFlight >= self.limit: return False
+        return self.remaining is None or self.remaining > self.inFlight or now >= self.resetAt
+
+    def free(self, now:float) -> int:
+        # requests the bucket could start right now
+        if self.remaining is None or now >= self.resetAt: return self.limit - self.inFlight
+        return min(self.limit, self.remaining) - self.inFlight
+
+class RequestScheduler:
+    heap:list[tuple] # (priority, sequence, route, bucket, factory, context, future, queuedAt)
+    buckets:dict[tuple[str, int], Bucket]
+    blocked:set[tuple[str, int]] # buckets with parked entries
+    inFlight:int
+    tasks:set[asyncio.Task] # every running request, held here so none is collected mid flight
+    sequence:itertools.count
+    wakeup:asyncio.TimerHandle
+    sent:int
+    cancelled:int
+
+    def __init__(self):
+        self.heap = []
+        self.buckets = {}
+        self.blocked = set()
+        self.inFlight = 0
+        self.tasks = set()
+        self.sequence = itertools.count()
+        self.wakeup = None
+        self.sent = 0
+        self.cancelled = 0
+
+    def bucket(self, key:tuple[str, int]) -> Bucket:
+        if key not in self.buckets: self.buckets[key] = Bucket(config.Outbound.routeLimits.get(key[0], config.Outbound.routeLimit))
+        return self.buckets[key]
+
+    def queued(self, priority:int = None) -> int:
+        entries = itertools.chain(self.heap, *(self.buckets[key].waiting for key in self.blocked))
+        return sum(1 for entry in entries if not entry[6].done() and (priority is None or entry[0] == priority))
+
+    async def run(self, priority:int, route:str, bucket:int, factory):
+        # factory builds the request coroutine once the request is allowed to start,
+        # it runs in the caller's context so per callback accounting still sees the call
+        future = asyncio.get_running_loop().create_future()
+        heapq.heappush(self.heap, (priority, next(self.sequence), route, bucket, factory, contextvars.copy_context(), future, time.perf_counter()))
+        self.pump()
+        return await future
+
+    def pump(self):
+        loop = asyncio.get_running_loop()
+        now = loop.time()
+        while self.heap and self.inFlight < config.Outbound.concurrency:
+            entry = heapq.heappop(self.heap)
+            priority, _, route, bucketId, factory, context, future, queuedAt = entry
+            if future.done(): self.cancelled += 1; continue
+
+            # a bucket out of budget keeps its entries aside, they return to the heap only once it frees up or resets
+            key = (route, bucketId)
+            bucket = self.bucket(key)
+            if not bucket.available(now):
+                heapq.heappush(bucket.waiting, entry)
+                self.blocked.add(key)
+                if bucket.resetAt > now: self.wakeAt(bucket.resetAt)
+                continue
+
+            bucket.inFlight += 1
+            self.inFlight += 1
+            metrics.observe("dementia_outbound_wait_seconds", CLASSES[priority], time.perf_counter() - queuedAt)
+            task = asyncio.create_task(self.execute(key, factory, future), context=context)
+            self.tasks.add(task)
+            task.add_done_callback(self.tasks.discard)
+            # a caller that stops waiting, a superseded render for example, takes its request down with it
+            future.add_done_callback(lambda future, task=task: task.cancel() if future.cancelled() else None)
+
+    def release(self, key:tuple[str, int], now:float):
+        # moves as many parked entries back as the bucket can start, the rest stay parked
+        bucket = self.buckets[key]
+        free = bucket.free(now)
+        while bucket.waiting and free > 0:
+            entry = heapq.heappop(bucket.waiting)
+            if entry[6].done(): self.cancelled += 1; continue
+            heapq.heappush(self.heap, entry)
+            free -= 1
+        if not bucket.waiting: self.blocked.discard(key)
+        # a response that emptied the bucket leaves the rest parked until its reset, nothing else would bring them back
+        elif bucket.resetAt > now: self.wakeAt(bucket.resetAt)
+
+    def wakeAt(self, when:float):
+        if self.wakeup is not None and self.wakeup.when() <= when: return
+        if self.wakeup is not None: self.wakeup.cancel()
+        self.wakeup = asyncio.get_running_loop().call_at(when, self.wake)
+
+    def wake(self):
+        # buckets out of budget until they reset get the dispatcher back at that moment
+        self.wakeup = None
+        now = asyncio.get_running_loop().time()
+        for key in list(self.blocked):
+            bucket = self.buckets[key]
+            if bucket.resetAt <= now: self.release(key, now)
+            else: self.wakeAt(bucket.resetAt)
+        self.pump()
+
+    async def execute(self, key:tuple[str, int], factory, future:asyncio.Future):
+        token = current.set(key)
+        try:
+            result = await factory()
+            if not future.done(): future.set_result(result)
+            self.sent += 1
+        except asyncio.CancelledError:
+            if not future.done(): future.cancel()
+        except Exception as e:
+            if not future.done(): future.set_exception(e)
+        finally:
+            current.reset(token)
+            bucket = self.bucket(key)
+            bucket.inFlight -= 1
+            self.inFlight -= 1
+            if bucket.waiting: self.release(key, asyncio.get_running_loop().time())
+            # idle buckets are forgotten once they reset, a message or channel gets a new one if it comes back
+            if bucket.inFlight == 0: asyncio.get_running_loop().call_at(bucket.resetAt, self.forget, key)
+            self.pump()
+
+    def forget(self, key:tuple[str, int]):
+        bucket = self.buckets.get(key)
+        if bucket is not None and bucket.inFlight == 0 and not bucket.waiting and bucket.resetAt <= asyncio.get_running_loop().time(): del self.buckets[key]
+
+    def observe(self, headers):
+        key = current.get()
+        if key is None or "X-RateLimit-Remaining" not in headers: return
+        bucket = self.bucket(key)
+        bucket.remaining = int(headers["X-RateLimit-Remaining"])
+        bucket.resetAt = asyncio.get_running_loop().time() + float(headers.get("X-RateLimit-Reset-After", 0))
+        if bucket.remaining == 0: metrics.increment("dementia_outbound_exhausted_total", key[0])
+
+SCHEDULER = RequestScheduler()
+
+def attach(traceConfig:aiohttp.TraceConfig) -> aiohttp.TraceConfig:
+    # rate limit headers of every scheduled request adjust the budget of its bucket
+    async def onRequestEnd(session, context, params):
+        SCHEDULER.observe(params.response.headers)
+
+    traceConfig.on_request_end.append(onRequestEnd)
+    return traceConfig
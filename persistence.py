@@ -0,0 +1,68 @@
+import asyncio
+import json
+import sqlite3
+import config
+import writebehind
+
+class SnapshotStore(writebehind.WriteBehind):
+    connection:sqlite3.Connection
+    dirty:dict[int, object] # gameId -> Game, snapshotted when the batch is flushed
+    deleted:set[int]
+    batches:int
+    writes:int
+
+    def __init__(self):
+        super().__init__("snapshots")
+        self.connection = None
+        self.dirty = {}
+        self.deleted = set()
+        self.batches = 0
+        self.writes = 0
+
+    def connect(self):
+        self.connection = sqlite3.connect(self.path, check_same_thread=False)
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.execute("PRAGMA synchronous=NORMAL")
+        self.connection.execute("CREATE TABLE IF NOT EXISTS games (id INTEGER PRIMARY KEY, guildId INTEGER NOT NULL, data TEXT NOT NULL)")
+        self.connection.commit()
+
+    def disconnect(self):
+        self.connection.close()
+
+    def interval(self) -> float:
+        return config.Persistence.flushInterval
+
+    def markDirty(self, game):
+        if not self.enabled: return
+        self.deleted.discard(game.id)
+        self.dirty[game.id] = game
+        self.schedule()
+
+    def discard(self, gameId:int):
+        if not self.enabled: return
+        self.dirty.pop(gameId, None)
+        self.deleted.add(gameId)
+        self.schedule()
+
+    def takeBatch(self) -> tuple[list[tuple], list[tuple]]:
+        rows = [(game.id, game.guildId, json.dumps(game.actor.published(), separators=(",", ":"), ensure_ascii=False)) for game in self.dirty.values()]
+        deleted = [(gameId,) for gameId in self.deleted]
+        self.dirty = {}
+        self.deleted = set()
+        return rows, deleted
+
+    def write(self, batch:tuple[list[tuple], list[tuple]]):
+        rows, deleted = batch
+        with self.connection:
+            self.connection.executemany("INSERT OR REPLACE INTO games (id, guildId, data) VALUES (?, ?, ?)", rows)
+            self.connection.executemany("DELETE FROM games WHERE id = ?", deleted)
+        self.batches += 1
+        self.writes += len(rows) + len(deleted)
+
+    def read(self) -> list[dict]:
+        return [json.loads(data) for (data,) in self.connection.execute("SELECT data FROM games")]
+
+    async def load(self) -> list[dict]:
+        return await asyncio.get_running_loop().run_in_executor(self.executor, self.read)
+
+STORE = SnapshotStore()
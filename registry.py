@@ -0,0 +1,88 @@
+import time
+import weakref
+import config
+
+class GameRegistry:
+    games:dict[int, object] # voice channel id -> Game
+    byUser:dict[int, object]
+    byHost:dict[int, object]
+    ended:weakref.WeakKeyDictionary # removed game -> when it was removed, entries vanish once the game is collected
+
+    def __init__(self):
+        self.games = {}
+        self.byUser = {}
+        self.byHost = {}
+        self.ended = weakref.WeakKeyDictionary()
+
+    def __len__(self) -> int:
+        return len(self.games)
+
+    def __iter__(self):
+        return iter(self.games)
+
+    def __contains__(self, channelId:int) -> bool:
+        return channelId in self.games
+
+    def __getitem__(self, channelId:int):
+        return self.games[channelId]
+
+    def __setitem__(self, channelId:int, game):
+        if channelId != game.id: raise KeyError(channelId)
+        self.add(game)
+
+    def get(self, channelId:int, default = None):
+        return self.games.get(channelId, default)
+
+    def keys(self):
+        return self.games.keys()
+
+    def values(self):
+        return self.games.values()
+
+    def items(self):
+        return self.games.items()
+
+    def clear(self):
+        self.games.clear()
+        self.byUser.clear()
+        self.byHost.clear()
+
+    @property
+    def full(self) -> bool:
+        return len(self.games) >= config.Registry.maxGames
+
+    def add(self, game):
+        # a game replacing an abandoned lobby in the same channel takes over its index entries
+        previous = self.games.get(game.id)
+        if previous is None and self.full: raise OverflowError(f"{len(self.games)} games are live, the limit is {config.Registry.maxGames}")
+        if previous is not None: self.remove(previous)
+
+        self.games[game.id] = game
+        self.byHost[game.hostId] = game
+        for playerId in game.players: self.byUser[playerId] = game
+
+    def remove(self, game) -> bool:
+        if self.games.get(game.id) is not game: return False
+        del self.games[game.id]
+        if self.byHost.get(game.hostId) is game: del self.byHost[game.hostId]
+        for playerId in game.players:
+            if self.byUser.get(playerId) is game: del self.byUser[playerId]
+        self.ended[game] = time.time()
+        return True
+
+    def isRegistered(self, game) -> bool:
+        return self.games.get(game.id) is game
+
+    def addPlayer(self, game, playerId:int):
+        if self.isRegistered(game): self.byUser[playerId] = game
+
+    def removePlayer(self, game, playerId:int):
+        if self.byUser.get(playerId) is game: del self.byUser[playerId]
+
+    def gameOf(self, userId:int):
+        return self.byUser.get(userId)
+
+    def hostedBy(self, userId:int):
+        return self.byHost.get(userId)
+
+GAMES = GameRegistry()
@@ -0,0 +1,92 @@
+import asyncio
+import hashlib
+import json
+import config
+import metrics
+import outbound
+
+def digest(embed, view) -> bytes:
+    # stable content hash of what a message shows, equal payloads mean the edit would change nothing
+    payload = json.dumps([None if embed is None else embed.to_dict(), None if view is None else view.to_components()], sort_keys=True, separators=(",", ":"))
+    return hashlib.blake2b(payload.encode("utf-8"), digest_size=16).digest()
+
+class RenderScheduler:
+    game:object
+    dirty:set[int]
+    inFlight:dict[int, asyncio.Task]
+    flushTask:asyncio.Task
+    payloads:dict[object, bytes] # message key ("lobby" or a player id) -> digest of the last payload sent to it
+    requested:int
+    sent:int
+    superseded:int
+    suppressed:int
+
+    def __init__(self, game):
+        self.game = game
+        self.dirty = set()
+        self.inFlight = {}
+        self.flushTask = None
+        self.payloads = {}
+        self.requested = 0
+        self.sent = 0
+        self.superseded = 0
+        self.suppressed = 0
+
+    @property
+    def saved(self) -> int:
+        return self.requested - self.sent - len(self.dirty) - len(self.inFlight)
+
+    def stats(self) -> dict:
+        return {"requested": self.requested, "sent": self.sent, "saved": self.saved, "superseded": self.superseded, "suppressed": self.suppressed, "pending": len(self.dirty), "inFlight": len(self.inFlight)}
+
+    def unchanged(self, key, payload:bytes) -> bool:
+        if self.payloads.get(key) != payload: return False
+        self.suppressed += 1
+        metrics.increment("dementia_suppressed_edits_total", "lobby" if key == "lobby" else "game")
+        return True
+
+    def request(self, userId:int = None):
+        playerIds = list(self.game.players.keys()) if userId is None else [userId]
+        for playerId in playerIds:
+            player = self.game.players.get(playerId)
+            if player is None or player.gameMsg is None: continue
+            self.requested += 1
+            self.dirty.add(playerId)
+
+        if self.dirty and self.flushTask is None:
+            self.flushTask = asyncio.create_task(self.flush())
+
+    async def flush(self):
+        await asyncio.sleep(config.RenderScheduler.window)
+        self.flushTask = None
+        dirty, self.dirty = self.dirty, set()
+        for playerId in dirty:
+            previous = self.inFlight.get(playerId)
+            self.inFlight[playerId] = asyncio.create_task(self.send(playerId, previous))
+
+    async def send(self, playerId:int, previous:asyncio.Task):
+        try:
+            if previous is not None and not previous.done():
+                # a newer state exists, the old edit is dropped and awaited so it can never land after this one
+                previous.cancel()
+                self.superseded += 1
+                await asyncio.gather(previous, return_exceptions=True)
+
+            player = self.game.players.get(playerId)
+            if player is None or player.gameMsg is None: return
+            embed, view = self.game.gameEmbed(playerId), self.game.gameView(playerId)
+            payload = digest(embed, view)
+            if self.unchanged(playerId, payload): return
+            await outbound.SCHEDULER.run(outbound.GAME_MESSAGE, "webhook.edit_message", player.gameMsg.id, lambda: self.game.editGameMessage(player.gameMsg, embed, view))
+            self.payloads[playerId] = payload
+            self.sent += 1
+        finally:
+            if self.inFlight.get(playerId) is asyncio.current_task(): self.inFlight.pop(playerId)
+
+    def close(self):
+        if self.flushTask is not None: self.flushTask.cancel()
+        for task in self.inFlight.values(): task.cancel()
+        self.flushTask = None
+        self.dirty.clear()
+        self.inFlight.clear()
+        self.payloads.clear()
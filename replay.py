@@ -0,0 +1,103 @@
+import argparse
+import json
+import time
+from collections import Counter
+import modal
+import gamelog
+import timeouts
+from game import Game
+
+# rebuilds games from a game log without discord, every record is applied through the same Game methods that wrote it
+
+class OfflineMember:
+    def __init__(self, id:int):
+        self.id = id
+        self.name = str(id)
+        self.display_name = str(id)
+
+class OfflineGuild:
+    def __init__(self, id:int):
+        self.id = id
+
+    def get_member(self, memberId:int) -> OfflineMember:
+        return OfflineMember(memberId)
+
+class OfflineClient:
+    # channels resolve to None so no status or message is ever written
+    def get_guild(self, guildId:int) -> OfflineGuild:
+        return OfflineGuild(guildId)
+
+    def get_channel(self, channelId:int):
+        return None
+
+class Replay:
+    client:OfflineClient
+    games:dict[int, Game] # game id -> game being rebuilt
+    finished:list[Game]
+    events:Counter
+    mismatches:list[tuple[int, str]] # (game id, what differed)
+
+    def __init__(self):
+        self.client = OfflineClient()
+        self.games = {}
+        self.finished = []
+        self.events = Counter()
+        self.mismatches = []
+
+    def apply(self, kind:int, gameId:int, values:tuple) -> Game:
+        self.events[gamelog.KINDS[kind][0]] += 1
+        if kind in (gamelog.CREATED, gamelog.RESTORED):
+            data = json.loads(values[0])
+            data["readyCountdown"] = None # a countdown left running is replayed by the roundStarted record it led to
+            game = Game.fromSnapshot(self.client, data)
+            timeouts.SCHEDULER.cancel(game.id)
+            timeouts.ROUNDS.cancel(game.id)
+            self.games[gameId] = game
+            return game
+
+        game = self.games.get(gameId)
+        if game is None: self.mismatches.append((gameId, f"{gamelog.KINDS[kind][0]} before the game was created")); return None
+        match kind:
+            case gamelog.JOINED: game.add_player(values[0])
+            case gamelog.LEFT:
+                if game.roundOrder is not None and values[0] in game.roundOrder: game.quit(values[0])
+                else: game.remove_player(values[0])
+            case gamelog.READY: game.setReady(values[0], values[1])
+            case gamelog.QUIT_VOTE: game.setQuit(values[0], values[1])
+            case gamelog.LANGUAGE: game.setLanguage(values[0])
+            case gamelog.SETTINGS: game.setSettings(*values)
+            case gamelog.STARTED: game.startLobby(seed=values[0])
+            case gamelog.IDENTITY: game.assignIdentity(values[0], values[1])
+            case gamelog.ROUND_STARTED: game.startGame()
+            case gamelog.NEXT_ROUND: game.nextRound()
+            case gamelog.NOTE: game.addNote(*values)
+            case gamelog.GUESS:
+                if game.guess(values[0], values[1]) != values[2]: self.mismatches.append((gameId, f"guess {values[1]!r} of {values[0]} matched differently"))
+            case gamelog.ENDED:
+                game.lobbyStatus = "finished"
+                game.touch()
+                if gamelog.digest(game) != values[1]: self.mismatches.append((gameId, "final state differs"))
+                self.finished.append(self.games.pop(gameId))
+        timeouts.SCHEDULER.cancel(game.id)
+        timeouts.ROUNDS.cancel(game.id)
+        return game
+
+    def run(self, records) -> "Replay":
+        for kind, gameId, _, values in records: self.apply(kind, gameId, values)
+        return self
+
+def main():
+    parser = argparse.ArgumentParser(prog="python replay.py", description="Rebuild games from a game log and check them against the recorded final states.")
+    parser.add_argument("path", nargs="?", default="gamelog.bin")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    replay = Replay().run(gamelog.read(args.path))
+    elapsed = time.perf_counter() - start
+    print(f"{sum(replay.events.values())} records, {len(replay.finished)} finished games, {len(replay.games)} still running, replayed in {elapsed * 1e3:.0f} ms")
+    for name, count in sorted(replay.events.items()): print(f"{name:<14} {count:>8}")
+    for gameId, problem in replay.mismatches: print(f"game {gameId}: {problem}")
+    raise SystemExit(1 if replay.mismatches else 0)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+import os
+
+SHARDS_ENV:str = "DEMENTIA_SHARDS"            # "first-last" shard range owned by this process
+SHARD_COUNT_ENV:str = "DEMENTIA_SHARD_COUNT"
+
+def shardForGuild(guildId:int, shardCount:int) -> int:
+    # the same formula discord uses to route a guild's gateway events
+    return (guildId >> 22) % shardCount
+
+def partition(shardCount:int, processes:int) -> list[range]:
+    processes = max(1, min(processes, shardCount))
+    size, extra = divmod(shardCount, processes)
+    ranges, start = [], 0
+    for i in range(processes):
+        end = start + size + (1 if i < extra else 0)
+        ranges.append(range(start, end))
+        start = end
+    return ranges
+
+def fromEnvironment() -> tuple[list[int], int]:
+    if SHARDS_ENV not in os.environ: return None, None
+    first, _, last = os.environ[SHARDS_ENV].partition("-")
+    return list(range(int(first), int(last or first) + 1)), int(os.environ[SHARD_COUNT_ENV])
+
+def environment(shards:range, shardCount:int) -> dict:
+    return {SHARDS_ENV: f"{shards.start}-{shards.stop - 1}", SHARD_COUNT_ENV: str(shardCount)}
+
+def ownsGuild(guildId:int, shardIds:list[int] = None, shardCount:int = None) -> bool:
+    if shardIds is None: shardIds, shardCount = fromEnvironment()
+    if shardIds is None: return True
+    return shardForGuild(guildId, shardCount) in shardIds
+
+def owned(snapshots:list[dict], shardIds:list[int] = None, shardCount:int = None) -> list[dict]:
+    # every worker reads the same snapshot table and restores only the games of guilds on its own shards
+    return [data for data in snapshots if ownsGuild(data["guildId"], shardIds, shardCount)]
+
+def workerPath(path:str, shardIds:list[int] = None) -> str:
+    # a file only one process may append to gets the worker's shard range in its name, "gamelog.bin" -> "gamelog.0-1.bin"
+    if shardIds is None: shardIds, _ = fromEnvironment()
+    if shardIds is None: return path
+    root, extension = os.path.splitext(path)
+    return f"{root}.{shardIds[0]}-{shardIds[-1]}{extension}"
+
+def workerPort(port:int, shardIds:list[int] = None) -> int:
+    # workers started from the same config listen next to each other, the one owning shard 0 keeps the configured port
+    if shardIds is None: shardIds, _ = fromEnvironment()
+    return port if shardIds is None else port + shardIds[0]
+
+def summary(client, games:dict) -> list[dict]:
+    shards = getattr(client, "shards", None) or {0: None}
+    shardCount = client.shard_count or 1
+    rows = {shardId: {"shard": shardId, "latency": None, "closed": None, "guilds": 0, "games": 0, "players": 0} for shardId in shards}
+
+    for shardId, info in shards.items():
+        if info is None: rows[shardId]["latency"], rows[shardId]["closed"] = client.latency, client.is_closed()
+        else: rows[shardId]["latency"], rows[shardId]["closed"] = info.latency, info.is_closed()
+
+    for guild in client.guilds:
+        shardId = shardForGuild(guild.id, shardCount)
+        if shardId in rows: rows[shardId]["guilds"] += 1
+
+    for game in games.values():
+        shardId = shardForGuild(game.guildId, shardCount)
+        if shardId not in rows: continue
+        rows[shardId]["games"] += 1
+        rows[shardId]["players"] += game.playerCount
+
+    return list(rows.values())
+
+def formatSummary(rows:list[dict]) -> str:
+    lines = [f"{'shard':>5} {'latency':>9} {'guilds':>7} {'games':>6} {'players':>8}"]
+    for row in rows:
+        latency = "-" if row["latency"] is None or row["latency"] != row["latency"] else f"{row['latency'] * 1e3:.0f}ms"
+        lines.append(f"{row['shard']:>5} {latency:>9} {row['guilds']:>7} {row['games']:>6} {row['players']:>8}{' closed' if row['closed'] else ''}")
+    return "\n".join(lines)
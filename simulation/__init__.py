@@ -0,0 +1,3 @@
+from simulation.rest import Rest
+from simulation.fakes import FakeClient, FakeGuild, FakeMember, FakeVoiceChannel, FakeMessage, FakeInteraction
+from simulation.driver import Simulation
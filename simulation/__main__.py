@@ -0,0 +1,48 @@
+import argparse
+import asyncio
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.chdir(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import config
+import modal
+import game
+import status
+import gamelog
+from simulation.rest import Rest
+from simulation.driver import Simulation, report
+
+parser = argparse.ArgumentParser(prog="python -m simulation", description="Play scripted games against fake discord objects, no network needed.")
+parser.add_argument("--games", type=int, default=100)
+parser.add_argument("--concurrency", type=int, default=100)
+parser.add_argument("--players", type=int, default=6)
+parser.add_argument("--rounds", type=int, default=12)
+parser.add_argument("--latency", type=float, default=0.05, help="mean REST latency in seconds")
+parser.add_argument("--jitter", type=float, default=0.02)
+parser.add_argument("--rate-limit", type=float, default=0.01, help="chance of a 429 per REST call")
+parser.add_argument("--retry-after", type=float, default=0.5)
+parser.add_argument("--seed", type=int, default=0)
+parser.add_argument("--record", help="append every game's records to this game log, replay.py reads it back")
+args = parser.parse_args()
+
+# shorten the waits that only exist for humans
+config.Game.readyCountdown = 0.1
+config.ChannelStatus.minInterval = 0.1
+
+async def main():
+    rng = random.Random(args.seed)
+    if args.record: await gamelog.RECORDER.open(args.record)
+    simulation = Simulation(Rest(args.latency, args.jitter, args.rate_limit, args.retry_after, random.Random(args.seed)), rng)
+    start = time.perf_counter()
+    await simulation.runMany(args.games, args.concurrency, args.players, args.rounds)
+    while status.WRITER.tasks: await asyncio.sleep(0.05)
+    elapsed = time.perf_counter() - start
+    print(report(simulation, elapsed))
+    if game.GAMES: print(f"{len(game.GAMES)} games were left running")
+
+asyncio.run(main())
+gamelog.RECORDER.close()
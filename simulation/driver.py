@@ -0,0 +1,136 @@
+import asyncio
+import random
+import time
+from collections import defaultdict
+import modal
+import game
+import dispatch
+import guards
+import metrics
+from simulation.rest import Rest, currentAction
+from simulation.fakes import FakeClient, FakeGuild, FakeMember, FakeMessage, FakeInteraction, FakeWebhook, messages
+
+# game messages are edited through the interaction webhook, in the simulation that reaches the fake message instead
+game.interactionWebhook = FakeWebhook
+
+class Simulation:
+    rest:Rest
+    client:FakeClient
+    rng:random.Random
+    timings:defaultdict[str, list[float]]
+    acknowledgements:defaultdict[str, list[float]]
+    actions:int
+    games:int
+
+    def __init__(self, rest:Rest, rng:random.Random = None):
+        self.rest = rest
+        self.client = FakeClient(rest)
+        self.rng = rng or random.Random(0)
+        self.timings = defaultdict(list)
+        self.acknowledgements = defaultdict(list)
+        self.actions = 0
+        self.games = 0
+
+    async def run(self, name:str, interaction:FakeInteraction, handler):
+        token = currentAction.set(name)
+        start = time.perf_counter()
+        try: await handler(interaction)
+        finally:
+            currentAction.reset(token)
+            self.timings[name].append(time.perf_counter() - start)
+            if interaction.acknowledged is not None: self.acknowledgements[name].append(interaction.acknowledged - interaction.created)
+            self.actions += 1
+
+    async def click(self, name:str, user:FakeMember, customId:str, message:FakeMessage = None, values:list[str] = None) -> FakeInteraction:
+        interaction = FakeInteraction(self.rest, user, customId, values=values, message=message)
+        await self.run(name, interaction, dispatch.dispatch)
+        return interaction
+
+    async def submit(self, name:str, user:FakeMember, form, **fields) -> FakeInteraction:
+        for field, value in fields.items(): getattr(form, field)._value = value # what discord.py fills in from the modal payload
+        interaction = FakeInteraction(self.rest, user)
+        await self.run(name, interaction, form.on_submit)
+        return interaction
+
+    async def host(self, host:FakeMember, gamemode:str = "healing", languageCode:str = "en") -> game.Game:
+        # what the /host mode select does in main.py
+        lobby = FakeMessage(self.rest, host.voice.channel)
+        interaction = FakeInteraction(self.rest, host, "modeSelect", values=[gamemode], message=lobby)
+
+        async def create(interaction:FakeInteraction):
+            if not await guards.canHost(interaction, languageCode): return
+            vc = interaction.user.voice.channel
+            game.GAMES[vc.id] = game.Game(self.client, interaction.guild, hostId=interaction.user.id, id=vc.id, gamemode=gamemode, languageCode=languageCode, vc=vc, msg=lobby)
+            await interaction.response.edit_message(embed=game.GAMES[vc.id].lobbyEmbed(), view=game.GAMES[vc.id].lobbyView())
+
+        await self.run("host", interaction, create)
+        return game.GAMES[host.voice.channel.id]
+
+    async def playGame(self, playerCount:int, rounds:int):
+        guild = FakeGuild(self.rest)
+        self.client.guilds.append(guild)
+        vc = guild.addVoiceChannel()
+        members = [guild.addMember(f"player{i}") for i in range(playerCount)]
+        for member in members: member.join(vc)
+
+        g = await self.host(members[0])
+        lobby = g.msg
+        for member in members[1:]: await self.click("join", member, f"join-{g.id}", lobby)
+        for member in members: await self.click("ready", member, f"ready-{g.id}", lobby)
+        await self.click("start", members[0], f"start-{g.id}", lobby)
+
+        for member in members:
+            interaction = await self.click("open", member, f"open-{g.id}", lobby)
+            await self.submit("assign", member, interaction.response.modal, identity=f"identity {self.rng.randrange(10 ** 6)}")
+
+        for member in members:
+            await asyncio.sleep(self.rng.uniform(0, 0.01))
+            await self.click("confirm", member, f"confirm-{g.id}", messages[g.players[member.id].gameMsg.id])
+
+        while g.gamePhase != "round": await asyncio.sleep(0.01)
+
+        for _ in range(rounds):
+            if g.id not in game.GAMES: break
+            member = guild.get_member(g.roundOrder[g.roundIndex])
+            if self.rng.random() < 0.25:
+                interaction = await self.click("guess", member, f"guess-{g.id}", messages[g.players[member.id].gameMsg.id])
+                identity = g.players[member.id].identity if self.rng.random() < 0.5 else "somebody else"
+                await self.submit("guessSubmit", member, interaction.response.modal, guess=identity)
+            else:
+                interaction = await self.click("note", member, f"note-{g.id}", messages[g.players[member.id].gameMsg.id])
+                await self.submit("noteSubmit", member, interaction.response.modal, question="question", answer="answer")
+
+        for member in members:
+            if g.id not in game.GAMES: break
+            await self.click("quit", member, f"quit-{g.id}", messages[g.players[member.id].gameMsg.id])
+
+        self.games += 1
+
+    async def runMany(self, games:int, concurrency:int, playerCount:int, rounds:int):
+        semaphore = asyncio.Semaphore(concurrency)
+        async def one():
+            async with semaphore: await self.playGame(playerCount, rounds)
+        await asyncio.gather(*(one() for _ in range(games)))
+
+def percentile(values:list[float], fraction:float) -> float:
+    if not values: return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+def report(simulation:Simulation, elapsed:float) -> str:
+    rest = simulation.rest
+    lines = [
+        f"{simulation.games} games, {simulation.actions} actions in {elapsed:.2f}s ({simulation.games / elapsed:.1f} games/s, {simulation.actions / elapsed:.0f} actions/s)",
+        f"REST calls: {sum(rest.calls.values())} ({sum(rest.calls.values()) / max(1, simulation.actions):.2f} per action), 429s: {sum(rest.rateLimited.values())}",
+        f"Suppressed no-op edits: lobby {metrics.counters.get(('dementia_suppressed_edits_total', 'lobby'), 0)}, game {metrics.counters.get(('dementia_suppressed_edits_total', 'game'), 0)}",
+        "",
+        f"{'callback':<12} {'count':>6} {'p50':>8} {'p95':>8} {'p99':>8} {'ack p99':>8} {'>3s':>5} {'REST':>6}",
+    ]
+    for name, values in sorted(simulation.timings.items()):
+        acks = simulation.acknowledgements[name]
+        lines.append(f"{name:<12} {len(values):>6} {percentile(values, 0.5) * 1e3:>6.1f}ms {percentile(values, 0.95) * 1e3:>6.1f}ms {percentile(values, 0.99) * 1e3:>6.1f}ms {percentile(acks, 0.99) * 1e3:>6.1f}ms {sum(ack > 3 for ack in acks):>5} {rest.callsByAction[name]:>6}")
+    lines.append(f"{'background':<12} {'':>6} {'':>8} {'':>8} {'':>8} {'':>8} {'':>5} {rest.callsByAction['background']:>6}")
+    lines += ["", f"{'route':<26} {'calls':>6} {'429s':>5} {'p99':>8}"]
+    for route, count in sorted(rest.calls.items()):
+        lines.append(f"{route:<26} {count:>6} {rest.rateLimited[route]:>5} {percentile(rest.durations[route], 0.99) * 1e3:>6.1f}ms")
+    return "\n".join(lines)
@@ -0,0 +1,167 @@
+import time
+import itertools
+import discord
+import metrics
+from simulation.rest import Rest
+
+# just enough of the discord.py surface used by game.py, modal.py and error.py, every REST call goes through Rest
+
+snowflakes = itertools.count(1 << 40)
+# ephemeral responses by id, the game keeps only id and token and reaches them through FakeWebhook
+messages:dict[int, "FakeMessage"] = {}
+
+class FakeMessage:
+    def __init__(self, rest:Rest, channel, embed:discord.Embed = None, view:discord.ui.View = None, ephemeral:bool = False):
+        self.rest = rest
+        self.id = next(snowflakes)
+        self.channel = channel
+        self.embed = embed
+        self.view = view
+        self.ephemeral = ephemeral
+        self.deleted = False
+        self.edits = 0
+        if ephemeral: messages[self.id] = self
+
+    async def edit(self, embed:discord.Embed = None, view:discord.ui.View = None, **kwargs):
+        await self.rest.request("webhook.edit_message" if self.ephemeral else "channel.edit_message")
+        if self.deleted: raise discord.NotFound(FakeResponseStatus(404), "Unknown Message")
+        self.embed, self.view = embed, view
+        self.edits += 1
+
+    async def delete(self):
+        await self.rest.request("webhook.delete_message" if self.ephemeral else "channel.delete_message")
+        if self.deleted: raise discord.NotFound(FakeResponseStatus(404), "Unknown Message")
+        self.deleted = True
+
+class FakeResponseStatus:
+    def __init__(self, status:int):
+        self.status = status
+        self.reason = "simulated"
+
+class FakeVoiceChannel:
+    def __init__(self, rest:Rest, guild):
+        self.rest = rest
+        self.id = next(snowflakes)
+        self.guild = guild
+        self.members = []
+        self.status = None
+
+    async def edit(self, status:str = None, **kwargs):
+        await self.rest.request("channel.edit_status")
+        self.status = status
+
+class FakeVoiceState:
+    def __init__(self, channel:FakeVoiceChannel):
+        self.channel = channel
+
+class FakeMember:
+    def __init__(self, guild, name:str):
+        self.id = next(snowflakes)
+        self.guild = guild
+        self.name = name
+        self.display_name = name
+        self.voice = None
+
+    def join(self, channel:FakeVoiceChannel):
+        self.voice = FakeVoiceState(channel)
+        channel.members.append(self)
+
+class FakeGuild:
+    def __init__(self, rest:Rest):
+        self.rest = rest
+        self.id = next(snowflakes)
+        self.members = {}
+        self.channels = {}
+
+    def addMember(self, name:str) -> FakeMember:
+        member = FakeMember(self, name)
+        self.members[member.id] = member
+        return member
+
+    def addVoiceChannel(self) -> FakeVoiceChannel:
+        channel = FakeVoiceChannel(self.rest, self)
+        self.channels[channel.id] = channel
+        return channel
+
+    def get_member(self, memberId:int) -> FakeMember:
+        return self.members.get(memberId)
+
+    def get_channel(self, channelId:int):
+        return self.channels.get(channelId)
+
+class FakeInteractionResponse:
+    def __init__(self, interaction):
+        self.interaction = interaction
+        self.done = False
+        self.modal = None
+
+    def is_done(self) -> bool:
+        return self.done
+
+    async def respond(self, route:str):
+        if self.done: raise discord.InteractionResponded(self.interaction)
+        self.done = True
+        self.interaction.acknowledged = time.perf_counter()
+        metrics.acknowledge()
+        await self.interaction.rest.request(route)
+
+    async def defer(self, **kwargs):
+        await self.respond("interaction.defer")
+
+    async def edit_message(self, embed:discord.Embed = None, view:discord.ui.View = None, **kwargs):
+        await self.respond("interaction.edit_message")
+        if self.interaction.message is not None: self.interaction.message.embed, self.interaction.message.view = embed, view
+
+    async def send_message(self, content:str = None, embed:discord.Embed = None, view:discord.ui.View = None, ephemeral:bool = False, **kwargs):
+        await self.respond("interaction.send_message")
+        self.interaction.sent = FakeMessage(self.interaction.rest, self.interaction.channel, embed, view, ephemeral)
+        self.interaction.sentContent = content
+
+    async def send_modal(self, modal:discord.ui.Modal):
+        await self.respond("interaction.send_modal")
+        self.modal = modal
+
+class FakeInteraction:
+    def __init__(self, rest:Rest, user:FakeMember, customId:str = None, values:list[str] = None, message:FakeMessage = None):
+        self.rest = rest
+        self.user = user
+        self.guild = user.guild
+        self.channel = message.channel if message is not None else None
+        self.message = message
+        self.type = discord.InteractionType.component if customId is not None else discord.InteractionType.modal_submit
+        self.data = {} if customId is None else {"custom_id": customId}
+        if values is not None: self.data["values"] = values
+        self.response = FakeInteractionResponse(self)
+        self.token = str(next(snowflakes))
+        self.created = time.perf_counter()
+        self.acknowledged = None
+        self.sent = None
+        self.sentContent = None
+
+    async def original_response(self) -> FakeMessage:
+        await self.rest.request("webhook.get_original")
+        return self.sent
+
+class FakeWebhook:
+    # what game.interactionWebhook returns, edits and deletes land on the FakeMessage the token's response created
+    def __init__(self, client, token:str):
+        self.token = token
+
+    async def edit_message(self, messageId:int, embed:discord.Embed = None, view:discord.ui.View = None, **kwargs):
+        await messages[messageId].edit(embed=embed, view=view)
+
+    async def delete_message(self, messageId:int):
+        await messages[messageId].delete()
+
+class FakeClient:
+    def __init__(self, rest:Rest):
+        self.rest = rest
+        self.guilds = []
+
+    def get_guild(self, guildId:int) -> FakeGuild:
+        return next((guild for guild in self.guilds if guild.id == guildId), None)
+
+    def get_channel(self, channelId:int):
+        for guild in self.guilds:
+            if channelId in guild.channels: return guild.channels[channelId]
+        return None
@@ -0,0 +1,44 @@
+import asyncio
+import contextvars
+import random
+import time
+from collections import Counter, defaultdict
+import metrics
+
+# the game action that caused a REST call, tasks spawned by a callback inherit it
+currentAction:contextvars.ContextVar[str] = contextvars.ContextVar("currentAction", default="background")
+
+class Rest:
+    latency:float
+    jitter:float
+    rateLimitChance:float
+    retryAfter:float
+    rng:random.Random
+    calls:Counter
+    callsByAction:Counter
+    rateLimited:Counter
+    durations:defaultdict[str, list[float]]
+
+    def __init__(self, latency:float = 0.05, jitter:float = 0.02, rateLimitChance:float = 0.0, retryAfter:float = 0.5, rng:random.Random = None):
+        self.latency = latency
+        self.jitter = jitter
+        self.rateLimitChance = rateLimitChance
+        self.retryAfter = retryAfter
+        self.rng = rng or random.Random(0)
+        self.calls = Counter()
+        self.callsByAction = Counter()
+        self.rateLimited = Counter()
+        self.durations = defaultdict(list)
+
+    async def request(self, route:str):
+        # discord.py retries 429s internally, so a rate limited call just takes longer
+        start = time.perf_counter()
+        self.calls[route] += 1
+        self.callsByAction[currentAction.get()] += 1
+        metrics.recordRest(route)
+        while True:
+            await asyncio.sleep(max(0.0, self.rng.gauss(self.latency, self.jitter)))
+            if self.rng.random() >= self.rateLimitChance: break
+            self.rateLimited[route] += 1
+            await asyncio.sleep(self.retryAfter)
+        self.durations[route].append(time.perf_counter() - start)
@@ -0,0 +1,42 @@
+import hashlib
+import json
+import os
+import time
+
+# imported first by main.py so the clock starts before discord.py and the game modules load
+START:float = time.perf_counter()
+
+import metrics
+import log
+
+PHASES:dict[str, float] = {}  # phase -> seconds since START
+
+def mark(phase:str):
+    if phase in PHASES: return
+    PHASES[phase] = time.perf_counter() - START
+    metrics.gauge(f"dementia_startup_{phase}_seconds", f"Seconds from process start until {phase}.", lambda: PHASES[phase])
+    log.info("startup phase", phase=phase, seconds=round(PHASES[phase], 3))
+
+def fingerprint(tree, applicationId:int) -> str:
+    commands = sorted((command.to_dict(tree) for command in tree.get_commands()), key=lambda command: (command["type"], command["name"]))
+    payload = json.dumps({"applicationId": applicationId, "commands": commands}, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+def readFingerprint(path:str) -> str|None:
+    if not os.path.exists(path): return None
+    with open(path, 'r', encoding="utf-8") as f:
+        return f.read().strip()
+
+def writeFingerprint(path:str, digest:str):
+    temporary = f"{path}.tmp"
+    with open(temporary, 'w', encoding="utf-8") as f:
+        f.write(digest)
+    os.replace(temporary, path)
+
+async def syncCommands(tree, applicationId:int, path:str, force:bool = False) -> bool:
+    # the global sync is heavily rate limited, it only runs when the tree differs from the last one synced
+    digest = fingerprint(tree, applicationId)
+    if not force and readFingerprint(path) == digest: return False
+    await tree.sync()
+    writeFingerprint(path, digest)
+    return True
@@ -0,0 +1,66 @@
+import discord
+import asyncio
+import config
+import log
+import outbound
+
+class ChannelStatusWriter:
+    pending:dict[int, tuple[discord.VoiceChannel, str]]
+    written:dict[int, str]
+    lastWrite:dict[int, float]
+    tasks:dict[int, asyncio.Task]
+    writes:int
+    skipped:int
+
+    def __init__(self):
+        self.pending = {}
+        self.written = {}
+        self.lastWrite = {}
+        self.tasks = {}
+        self.writes = 0
+        self.skipped = 0
+
+    @property
+    def queueDepth(self) -> int:
+        return len(self.pending)
+
+    def set(self, vc:discord.VoiceChannel, status:str):
+        # with a write pending or in flight, written may not be what the channel ends up showing, the flush loop compares again
+        if vc.id not in self.tasks and self.written.get(vc.id) == status:
+            self.skipped += 1
+            return
+
+        if vc.id in self.pending: self.skipped += 1
+        self.pending[vc.id] = (vc, status)
+        if vc.id not in self.tasks: self.tasks[vc.id] = asyncio.create_task(self.flush(vc.id))
+
+    async def flush(self, channelId:int):
+        loop = asyncio.get_running_loop()
+        try:
+            while channelId in self.pending:
+                wait = self.lastWrite.get(channelId, float("-inf")) + config.ChannelStatus.minInterval - loop.time()
+                if wait > 0: await asyncio.sleep(wait)
+
+                vc, status = self.pending.pop(channelId)
+                if self.written.get(channelId) == status:
+                    self.skipped += 1
+                    continue
+
+                self.lastWrite[channelId] = loop.time()
+                try:
+                    await outbound.SCHEDULER.run(outbound.CHANNEL_STATUS, "channel.edit_status", channelId, lambda: vc.edit(status=status))
+                    self.written[channelId] = status
+                    self.writes += 1
+                except discord.HTTPException as e:
+                    log.warning("status write failed", channelId=channelId, error=str(e))
+        finally:
+            self.tasks.pop(channelId, None)
+            # a channel cleared by its game ending is forgotten once the spacing of its last write ran out
+            if self.written.get(channelId) == "": loop.call_at(self.lastWrite[channelId] + config.ChannelStatus.minInterval, self.forget, channelId)
+
+    def forget(self, channelId:int):
+        if channelId in self.tasks or self.written.get(channelId) != "": return
+        self.written.pop(channelId, None)
+        self.lastWrite.pop(channelId, None)
+
+WRITER = ChannelStatusWriter()
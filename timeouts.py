@@ -0,0 +1,75 @@
+import asyncio
+import datetime
+import heapq
+import time
+
+class TimeoutScheduler:
+    heap:list[tuple[float, int, int]] # (deadline, generation, gameId), stale entries are skipped lazily
+    deadlines:dict[int, tuple[float, int]]
+    generation:int
+    wakeup:asyncio.Event
+    task:asyncio.Task
+    expiring:set[asyncio.Task]
+    wakeups:int
+
+    def __init__(self):
+        self.heap = []
+        self.deadlines = {}
+        self.generation = 0
+        self.wakeup = asyncio.Event()
+        self.task = None
+        self.expiring = set()
+        self.wakeups = 0
+
+    def __len__(self) -> int:
+        return len(self.deadlines)
+
+    def schedule(self, gameId:int, deadline:datetime.datetime):
+        if deadline is None: self.cancel(gameId); return
+
+        self.generation += 1
+        entry = (deadline.timestamp(), self.generation, gameId)
+        self.deadlines[gameId] = entry[:2]
+        heapq.heappush(self.heap, entry)
+
+        if len(self.heap) > 2 * len(self.deadlines) + 64: self.compact()
+        if entry[0] <= self.heap[0][0]: self.wakeup.set()
+
+    def cancel(self, gameId:int):
+        self.deadlines.pop(gameId, None)
+
+    def compact(self):
+        self.heap = [(deadline, generation, gameId) for gameId, (deadline, generation) in self.deadlines.items()]
+        heapq.heapify(self.heap)
+
+    def nextDeadline(self) -> float:
+        while self.heap and self.deadlines.get(self.heap[0][2]) != self.heap[0][:2]: heapq.heappop(self.heap)
+        return self.heap[0][0] if self.heap else None
+
+    def start(self, onExpire):
+        if self.task is None: self.task = asyncio.create_task(self.run(onExpire))
+
+    def stop(self):
+        if self.task is not None: self.task.cancel()
+        self.task = None
+
+    async def run(self, onExpire):
+        while True:
+            deadline = self.nextDeadline()
+            delay = None if deadline is None else deadline - time.time()
+
+            if delay is None or delay > 0:
+                self.wakeup.clear()
+                try: await asyncio.wait_for(self.wakeup.wait(), delay)
+                except asyncio.TimeoutError: pass
+                self.wakeups += 1
+                continue
+
+            _, _, gameId = heapq.heappop(self.heap)
+            del self.deadlines[gameId]
+            task = asyncio.create_task(onExpire(gameId))
+            self.expiring.add(task)
+            task.add_done_callback(self.expiring.discard)
+
+SCHEDULER = TimeoutScheduler()  # lobby inactivity
+ROUNDS = TimeoutScheduler()  # round time limits, one task for every running round
@@ -0,0 +1,182 @@
+import bisect
+import json
+import mmap
+import os
+import random
+import struct
+import threading
+import guess
+
+ROOT:str = "wordbanks"
+MAGIC:bytes = b"DWB1"
+HEADER = struct.Struct("<4sI")  # magic, length of the json table of contents
+LENGTH = struct.Struct("<H")
+OFFSET = struct.Struct("<I")
+
+# file layout: header | table of contents | body
+# body holds display strings (length + utf8), key records (length + normalized utf8 + display offset)
+# and tables of offsets, every offset is relative to the start of the body
+# each category has an "index" table of key records sorted by key and a "words" table of display offsets,
+# "all" is the same pair over every category
+
+def readJson(path:str):
+    if not os.path.exists(path): return None
+    with open(path, 'r', encoding="utf-8") as f:
+        data = json.load(f)
+    return data
+
+def suffixes(key:str) -> list[str]:
+    # every word start is indexed so "ein" finds "Albert Einstein"
+    words = key.split(" ")
+    return [" ".join(words[i:]) for i in range(len(words))]
+
+def build(source:str, target:str, languageCode:str):
+    data = readJson(source)
+    body = bytearray()
+    displays:dict[str, int] = {}
+    records:dict[tuple[bytes, int], int] = {}
+
+    def addDisplay(display:str) -> int:
+        if display not in displays:
+            encoded = display.encode("utf-8")
+            displays[display] = len(body)
+            body.extend(LENGTH.pack(len(encoded)) + encoded)
+        return displays[display]
+
+    def addRecord(key:bytes, display:int) -> int:
+        if (key, display) not in records:
+            records[(key, display)] = len(body)
+            body.extend(LENGTH.pack(len(key)) + key + OFFSET.pack(display))
+        return records[(key, display)]
+
+    def addTable(offsets:list[int]) -> list[int]:
+        start = len(body)
+        for offset in offsets: body.extend(OFFSET.pack(offset))
+        return [start, len(offsets)]
+
+    categories = {}
+    allIndex, allWords = {}, {}
+    for categoryId, category in data.items():
+        index, words = {}, {}
+        for word in category["words"]:
+            display = addDisplay(word)
+            words[display] = None
+            for key in suffixes(guess.normalize(word, languageCode)):
+                if not key: continue
+                key = key.encode("utf-8")
+                index[(key, display)] = addRecord(key, display)
+        allIndex.update(index)
+        allWords.update(words)
+        categories[categoryId] = {"display": category["display"], "normalized": guess.normalize(category["display"], languageCode), "index": index, "words": list(words)}
+
+    for category in categories.values():
+        category["index"] = addTable([category["index"][pair] for pair in sorted(category["index"])])
+        category["words"] = addTable(category["words"])
+    toc = json.dumps({"categories": categories, "all": {"index": addTable([allIndex[pair] for pair in sorted(allIndex)]), "words": addTable(list(allWords))}}).encode("utf-8")
+
+    # one file per process, workers rebuilding the same bank never write into each other's temporary
+    temporary = f"{target}.{os.getpid()}.tmp"
+    try:
+        with open(temporary, "wb") as f:
+            f.write(HEADER.pack(MAGIC, len(toc)) + toc + body)
+        os.replace(temporary, target)
+    except BaseException:
+        if os.path.exists(temporary): os.remove(temporary)
+        raise
+
+class Keys:
+    # sequence over one sorted table, bisect only reads the keys it probes
+    def __init__(self, bank, table:list[int]):
+        self.bank = bank
+        self.start, self.count = table
+
+    def __len__(self):
+        return self.count
+
+    def __getitem__(self, i:int) -> bytes:
+        return self.bank.key(self.bank.entry(self.start, i))
+
+class WordBank:
+    languageCode:str
+    categories:dict[str, dict]
+    all:dict
+
+    def __init__(self, path:str, languageCode:str):
+        self.languageCode = languageCode
+        with open(path, "rb") as f:
+            self.map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, tocLength = HEADER.unpack_from(self.map, 0)
+        if magic != MAGIC: raise ValueError(f"{path} is not a word bank")
+        toc = json.loads(self.map[HEADER.size:HEADER.size + tocLength])
+        self.base = HEADER.size + tocLength
+        self.categories = toc["categories"]
+        self.all = toc["all"]
+
+    def entry(self, start:int, i:int) -> int:
+        return OFFSET.unpack_from(self.map, self.base + start + i * OFFSET.size)[0]
+
+    def key(self, record:int) -> bytes:
+        start = self.base + record + LENGTH.size
+        return self.map[start:start + LENGTH.unpack_from(self.map, self.base + record)[0]]
+
+    def displayOf(self, record:int) -> int:
+        return OFFSET.unpack_from(self.map, self.base + record + LENGTH.size + LENGTH.unpack_from(self.map, self.base + record)[0])[0]
+
+    def display(self, offset:int) -> str:
+        start = self.base + offset + LENGTH.size
+        return self.map[start:start + LENGTH.unpack_from(self.map, self.base + offset)[0]].decode("utf-8")
+
+    def section(self, categoryId:str|None) -> dict:
+        return self.categories.get(categoryId, self.all) if categoryId is not None else self.all
+
+    def complete(self, prefix:str, categoryId:str = None, limit:int = 25) -> list[str]:
+        table = self.section(categoryId)["index"]
+        keys = Keys(self, table)
+        prefix = guess.normalize(prefix, self.languageCode).encode("utf-8")
+        found:dict[int, None] = {}
+        for i in range(bisect.bisect_left(keys, prefix), len(keys)):
+            record = self.entry(table[0], i)
+            if not self.key(record).startswith(prefix): break
+            found[self.displayOf(record)] = None
+            if len(found) == limit: break
+        return [self.display(offset) for offset in found]
+
+    def suggest(self, categoryId:str = None, count:int = 3, rng:random.Random = random) -> list[str]:
+        start, total = self.section(categoryId)["words"]
+        return [self.display(self.entry(start, i)) for i in rng.sample(range(total), min(count, total))]
+
+    def resolve(self, category:str|None) -> str|None:
+        # maps free text from the settings to a category id, None when the bank has no such category
+        if not category: return None
+        category = guess.normalize(category, self.languageCode)
+        for categoryId, entry in self.categories.items():
+            if category in (categoryId, entry["normalized"]): return categoryId
+        return None
+
+    def completeCategory(self, prefix:str, limit:int = 25) -> list[str]:
+        prefix = guess.normalize(prefix, self.languageCode)
+        return [entry["display"] for entry in self.categories.values() if any(key.startswith(prefix) for key in suffixes(entry["normalized"]))][:limit]
+
+    def close(self):
+        self.map.close()
+
+_banks:dict[str, WordBank] = {}
+_lock = threading.Lock()
+
+def sourcePath(languageCode:str) -> str:
+    return os.path.join(ROOT, f"{languageCode}.json")
+
+def compiledPath(languageCode:str) -> str:
+    return os.path.join(ROOT, f"{languageCode}.dwb")
+
+def load(languageCode:str) -> WordBank|None:
+    source, target = sourcePath(languageCode), compiledPath(languageCode)
+    if not os.path.exists(source): return None
+    if not os.path.exists(target) or os.path.getmtime(target) < os.path.getmtime(source): build(source, target, languageCode)
+    return WordBank(target, languageCode)
+
+def get(languageCode:str) -> WordBank|None:
+    if languageCode in _banks: return _banks[languageCode]
+    with _lock:
+        if languageCode not in _banks: _banks[languageCode] = load(languageCode)
+    return _banks[languageCode]
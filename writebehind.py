@@ -0,0 +1,71 @@
+import abc
+import asyncio
+import concurrent.futures
+import log
+
+class WriteBehind(abc.ABC):
+    # batches are taken on the event loop so they are consistent, only the disk write leaves it,
+    # one worker thread per store keeps every access to its file or connection on the same thread
+    name:str
+    path:str
+    executor:concurrent.futures.ThreadPoolExecutor
+    task:asyncio.Task
+    failures:int
+
+    def __init__(self, name:str):
+        self.name = name
+        self.path = None
+        self.executor = concurrent.futures.ThreadPoolExecutor(max_workers=1, thread_name_prefix=name)
+        self.task = None
+        self.failures = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.path is not None
+
+    async def open(self, path:str):
+        self.path = path
+        await asyncio.get_running_loop().run_in_executor(self.executor, self.connect)
+
+    @abc.abstractmethod
+    def connect(self): ...
+    @abc.abstractmethod
+    def disconnect(self): ...
+    @abc.abstractmethod
+    def takeBatch(self): ...
+    @abc.abstractmethod
+    def write(self, batch): ...
+    @abc.abstractmethod
+    def interval(self) -> float: ...
+
+    def submit(self, batch) -> asyncio.Future:
+        future = asyncio.get_running_loop().run_in_executor(self.executor, self.write, batch)
+        future.add_done_callback(self.reportFailure)
+        return future
+
+    def reportFailure(self, future:asyncio.Future):
+        if future.cancelled() or future.exception() is None: return
+        self.failures += 1
+        log.error("write behind failed, batch lost", store=self.name, path=self.path, error=repr(future.exception()))
+
+    def schedule(self):
+        if self.task is None: self.task = asyncio.create_task(self.flushLater())
+
+    async def flushLater(self):
+        await asyncio.sleep(self.interval())
+        self.task = None
+        self.submit(self.takeBatch())
+
+    def flushNow(self):
+        if self.task is not None: self.task.cancel()
+        self.task = None
+        self.submit(self.takeBatch())
+
+    def close(self):
+        # called after the event loop has stopped, whatever is still pending is written synchronously
+        if not self.enabled: return
+        if self.task is not None: self.task.cancel()
+        try: self.executor.submit(self.write, self.takeBatch()).result()
+        except Exception as e: self.failures += 1; log.error("write behind failed, batch lost", store=self.name, path=self.path, error=repr(e))
+        self.executor.submit(self.disconnect).result()
+        self.path = None